@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Benchmark name lookups in ``CancerCaseSheet`` against linear scans
+
+Generates cancer sheets with one normal and two tumor samples per donor and
+times finding the sample pair of tumor DNA libraries by scanning
+``all_sample_pairs`` and through ``CancerCaseSheet.lookup()``.  Run from the
+repository root, e.g.::
+
+    python benchmarks/bench_cancer_lookup.py --donors 1000 10000
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+
+from biomedsheets import io_tsv, shortcuts
+
+__author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
+
+#: Numbers of donors to benchmark with
+DEFAULT_DONORS = (1000, 5000, 20000)
+
+#: Rows of each donor, without the patient name
+DONOR_ROWS = (
+    ("N1", "N", "WES"),
+    ("T1", "Y", "WES"),
+    ("T1", "Y", "mRNA_seq"),
+    ("T2", "Y", "WES"),
+)
+
+
+def make_sheet(donors):
+    """Return cancer ``Sheet`` with ``donors`` donors"""
+    lines = ["[Data]", "patientName\tsampleName\tisTumor\tlibraryType\tfolderName"]
+    for no in range(donors):
+        for sample, is_tumor, library_type in DONOR_ROWS:
+            folder = "P{}-{}-{}".format(no, sample, library_type)
+            lines.append("\t".join(("P{}".format(no), sample, is_tumor, library_type, folder)))
+    return io_tsv.read_cancer_tsv_sheet(io.StringIO("\n".join(lines) + "\n"))
+
+
+def per_query(func, queries, repeat=1):
+    """Return seconds per query of calling ``func`` for each of ``queries``"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - start) / (len(queries) * repeat)
+
+
+def main(argv=None):
+    """Main program entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--donors", type=int, nargs="+", default=DEFAULT_DONORS, help="Numbers of donors"
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Number of names to look up")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for choosing the names")
+    args = parser.parse_args(argv)
+    print(
+        "{:>8} {:>10} {:>14} {:>14}".format("donors", "index [s]", "scan [us/q]", "lookup [us/q]")
+    )
+    for donors in args.donors:
+        cases = shortcuts.CancerCaseSheet(make_sheet(donors))
+        names = [pair.tumor_sample.dna_ngs_library.name for pair in cases.all_sample_pairs]
+        queries = random.Random(args.seed).sample(names, min(args.queries, len(names)))
+
+        def scan(name):
+            return next(
+                pair
+                for pair in cases.all_sample_pairs
+                if pair.tumor_sample.dna_ngs_library.name == name
+            )
+
+        start = time.perf_counter()
+        cases.index.by_name
+        index_time = time.perf_counter() - start
+        scan_time = per_query(scan, queries)
+        lookup_time = per_query(lambda name: cases.lookup(name).pair, queries, repeat=100)
+        assert all(cases.lookup(name).pair is scan(name) for name in queries[:10])
+        print(
+            "{:>8} {:>10.3f} {:>14.1f} {:>14.3f}".format(
+                donors, index_time, scan_time * 1e6, lookup_time * 1e6
+            ),
+            flush=True,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Benchmark building the shortcuts of germline ``Cohort`` objects
+
+Generates trio pedigrees of increasing size and times the construction of
+``Cohort`` from them.  Run from the repository root, e.g.::
+
+    python benchmarks/bench_cohort.py --max-donors 1000000
+
+For comparing with another checkout, put it first in ``PYTHONPATH``.
+"""
+
+import argparse
+import gc
+import sys
+import time
+
+from biomedsheets import models
+from biomedsheets.shortcuts.germline import Cohort, GermlineDonor, Pedigree
+
+__author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
+
+#: Numbers of donors to benchmark with
+DEFAULT_SIZES = (1000, 3000, 10000, 30000, 100000, 300000, 1000000)
+
+
+def make_pedigrees(count):
+    """Return list of trio ``Pedigree`` objects with ``count`` donors in total"""
+    result = []
+    for first in range(0, count - count % 3, 3):
+        donors = []
+        for pk, father, mother, affected in (
+            (first, None, None, "unaffected"),
+            (first + 1, None, None, "unaffected"),
+            (first + 2, first, first + 1, "affected"),
+        ):
+            extra_infos = {"isAffected": affected, "fatherPk": father, "motherPk": mother}
+            bio_entity = models.BioEntity(pk, False, "D{}".format(pk), extra_infos=extra_infos)
+            donors.append(GermlineDonor(None, bio_entity))
+        result.append(Pedigree(donors, index=donors[2]))
+    return result
+
+
+def main(argv=None):
+    """Main program entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--max-donors", type=int, default=DEFAULT_SIZES[-1], help="Largest number of donors"
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=60.0,
+        help="Stop after a size that took longer than this many seconds",
+    )
+    args = parser.parse_args(argv)
+    print("{:>10} {:>10}".format("donors", "seconds"))
+    for size in DEFAULT_SIZES:
+        if size > args.max_donors:
+            break
+        pedigrees = make_pedigrees(size)
+        gc.collect()
+        start = time.perf_counter()
+        cohort = Cohort(pedigrees)
+        elapsed = time.perf_counter() - start
+        assert len(cohort.name_to_donor) == len(pedigrees) * 3
+        print("{:>10} {:>10.3f}".format(len(pedigrees) * 3, elapsed), flush=True)
+        if elapsed > args.time_limit:
+            break
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
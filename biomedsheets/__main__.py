@@ -81,7 +81,11 @@ class JsonSheetAppBase(AppBase):
     def resolve_refs(self, sheet_json):
         """Resolve "$ref" JSON pointers in sheet_json"""
         print('Resolving {{ "$ref": "..." }} in JSON...')
-        resolver = RefResolver(lookup_paths=self.get_lib_dirs(), dict_class=collections.OrderedDict)
+        resolver = RefResolver(
+            lookup_paths=self.get_lib_dirs(),
+            dict_class=collections.OrderedDict,
+            cache_dir=self.args.ref_cache_dir,
+        )
         return resolver.resolve("file://" + self.args.input, sheet_json)
 
     def validate_and_print_errors(self):
@@ -148,6 +152,12 @@ def main(argv=None):
         action="append",
         help=("Base directorie for JSON file pointers, can be given " "multiple times"),
     )
+    parser.add_argument(
+        "--ref-cache-dir",
+        type=str,
+        default=None,
+        help="Directory for persistent cache of documents included via JSON pointers",
+    )
 
     subparsers = parser.add_subparsers(dest="subparser")
 
@@ -0,0 +1,773 @@
+# -*- coding: utf-8 -*-
+"""Columnar, memory-mappable representation of ``models.Sheet``
+
+The entries of each level (bio entities, bio samples, test samples, and NGS
+libraries) are stored in parallel arrays: primary key, disabled flag,
+parent index, child ranges, and offsets into a string heap for secondary
+IDs.  Extra info values are stored in one column per key, typed according
+to the "extraInfoDefs" of the sheet.  The file is opened via ``mmap`` such
+that multiple processes share the pages.  Alternatively, the representation
+can be published in a ``multiprocessing.shared_memory`` segment using
+``SharedColumnarSheet`` and attached from other processes with
+``ColumnarSheet.attach()``.  The header carries a fingerprint of the content
+such that workers can detect stale segments.
+
+``ColumnarSheet`` provides thin read-only views with the attribute API of
+the ``models`` classes on top of the columns.
+"""
+
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:  # Python < 3.8
+    SHARED_MEMORY_AVAILABLE = False
+
+from . import models
+from .naming import DEFAULT_NAME_GENERATOR, PatternNameGenerator
+
+__author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
+
+#: Magic bytes at the start of columnar sheet files
+COLUMNAR_MAGIC = b"BMSCOLS\x00"
+
+#: Version of the columnar layout, bump on incompatible changes
+COLUMNAR_FORMAT_VERSION = 1
+
+#: Whether shared memory segments are registered with the resource tracker
+SHARED_MEMORY_TRACKED = SHARED_MEMORY_AVAILABLE and os.name == "posix"
+
+#: Level index of bio entities
+LEVEL_BIO_ENTITY = 0
+#: Level index of bio samples
+LEVEL_BIO_SAMPLE = 1
+#: Level index of test samples
+LEVEL_TEST_SAMPLE = 2
+#: Level index of NGS libraries
+LEVEL_NGS_LIBRARY = 3
+
+#: Keys of the levels in "extraInfoDefs"
+LEVEL_KEYS = ("bioEntity", "bioSample", "testSample", "ngsLibrary")
+
+#: Storage kind of extra info columns by "extraInfoDefs" type, types not
+#: listed here are stored as JSON text
+EXTRA_INFO_KINDS = {
+    "boolean": "bool",
+    "integer": "int",
+    "number": "float",
+    "string": "str",
+    "pattern": "str",
+    "enum": "str",
+}
+
+#: Python type required for all values of a column of the given kind
+_KIND_TYPES = {"bool": bool, "int": int, "float": float, "str": str}
+
+# Prefix: magic, format version, header length, header offset
+_PREFIX = struct.Struct("<8sIIQ")
+
+# Alignment of the sections in bytes
+_ALIGNMENT = 8
+
+# Names of the segments published by ``SharedColumnarSheet`` in this process, inherited
+# by forked children that share its resource tracker
+_PUBLISHED_SEGMENTS = set()
+
+
+class ColumnarSheetException(Exception):
+    """Raised on problems with columnar sheet files"""
+
+
+# Writing ---------------------------------------------------------------------
+
+
+class _Writer:
+    """Helper for serializing a sheet into the columnar layout"""
+
+    def __init__(self):
+        #: Section data, aligned
+        self.buf = bytearray(_PREFIX.size)
+        #: Mapping from section name to ``(offset, typecode, count)``
+        self.sections = {}
+        #: String heap, written as last section
+        self.heap = bytearray()
+
+    def add(self, name, typecode, values):
+        """Add section with array of ``typecode`` from ``values``"""
+        arr = array(typecode, values)
+        self.buf.extend(b"\x00" * (-len(self.buf) % _ALIGNMENT))
+        self.sections[name] = (len(self.buf), typecode, len(arr))
+        self.buf.extend(arr.tobytes())
+
+    def add_strings(self, name, strings):
+        """Add ``strings`` to the heap and section with their offsets into it"""
+        offsets = array("Q", [len(self.heap)])
+        for string in strings:
+            self.heap.extend(string.encode("utf-8"))
+            offsets.append(len(self.heap))
+        self.add(name, "Q", offsets)
+
+    def finish(self, header):
+        self.add("heap", "B", self.heap)
+        header = dict(header, sections=self.sections)
+        # The fingerprint covers the sections and the header without the fingerprint
+        digest = hashlib.sha256(memoryview(self.buf)[_PREFIX.size :])
+        digest.update(json.dumps(header, sort_keys=True).encode("utf-8"))
+        header["fingerprint"] = digest.hexdigest()
+        header_bytes = json.dumps(header).encode("utf-8")
+        header_offset = len(self.buf)
+        self.buf.extend(header_bytes)
+        _PREFIX.pack_into(
+            self.buf, 0, COLUMNAR_MAGIC, COLUMNAR_FORMAT_VERSION, len(header_bytes), header_offset
+        )
+        return bytes(self.buf)
+
+
+def _iter_levels(sheet):
+    """Return entries of ``sheet`` by level, children of one parent are contiguous"""
+    levels = [list(sheet.bio_entities.values()), [], [], []]
+    for level, attr in enumerate(("bio_samples", "test_samples", "ngs_libraries")):
+        for entry in levels[level]:
+            levels[level + 1].extend(getattr(entry, attr).values())
+    return levels
+
+
+def _extra_info_kind(definition, values):
+    """Return storage kind for an extra info column"""
+    kind = EXTRA_INFO_KINDS.get((definition or {}).get("type"), "json")
+    if kind != "json" and not all(type(v) is _KIND_TYPES[kind] for v in values if v is not None):
+        kind = "json"  # values do not fit the declared type
+    return kind
+
+
+def _write_extra_infos(writer, level, entries, defs):
+    """Write extra info columns of ``entries``, return column descriptions"""
+    keys = list(defs)
+    seen = set(keys)
+    for entry in entries:
+        for key in entry.extra_infos:
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+    columns = []
+    for no, key in enumerate(keys):
+        values = [entry.extra_infos.get(key) for entry in entries]
+        present = [int(key in entry.extra_infos) for entry in entries]
+        if not any(present):
+            continue
+        kind = _extra_info_kind(defs.get(key), values)
+        prefix = "{}.extra.{}".format(level, no)
+        writer.add(prefix + ".present", "B", present)
+        if kind == "bool":
+            writer.add(prefix + ".values", "B", [int(bool(v)) for v in values])
+        elif kind == "int":
+            writer.add(prefix + ".values", "q", [v or 0 for v in values])
+        elif kind == "float":
+            writer.add(prefix + ".values", "d", [v or 0.0 for v in values])
+        elif kind == "str":
+            writer.add_strings(prefix + ".values", [v or "" for v in values])
+        else:
+            writer.add_strings(
+                prefix + ".values",
+                [json.dumps(v) if p else "" for v, p in zip(values, present)],
+            )
+        columns.append((key, kind, prefix))
+    return columns
+
+
+def build_columnar(sheet):
+    """Return ``bytes`` with the columnar representation of ``models.Sheet``
+
+    The extra info column types are taken from ``sheet.json_data``.
+    """
+    writer = _Writer()
+    levels = _iter_levels(sheet)
+    extra_infos_defs = (sheet.json_data or {}).get("extraInfoDefs", {})
+    level_headers = []
+    starts = None  # child ranges of the previous level
+    for level, entries in enumerate(levels):
+        pks = [entry.pk for entry in entries]
+        if all(type(pk) is int for pk in pks):
+            pk_kind = "int"
+            writer.add("{}.pk".format(level), "q", pks)
+        else:  # e.g., strings in JSON sheets
+            pk_kind = "json"
+            writer.add_strings("{}.pk".format(level), map(json.dumps, pks))
+        writer.add("{}.disabled".format(level), "B", [int(entry.disabled) for entry in entries])
+        writer.add_strings("{}.secondary_id".format(level), [e.secondary_id for e in entries])
+        writer.add_strings(
+            "{}.extra_ids".format(level),
+            [json.dumps(e.extra_ids) if e.extra_ids else "" for e in entries],
+        )
+        if level > LEVEL_BIO_ENTITY:
+            writer.add(
+                "{}.parent".format(level),
+                "q",
+                (i for i in range(len(starts) - 1) for _ in range(starts[i + 1] - starts[i])),
+            )
+        if level < LEVEL_NGS_LIBRARY:
+            child_attr = ("bio_samples", "test_samples", "ngs_libraries")[level]
+            starts = array("q", [0])
+            for entry in entries:
+                starts.append(starts[-1] + len(getattr(entry, child_attr)))
+            writer.add("{}.children".format(level), "q", starts)
+        defs = extra_infos_defs.get(LEVEL_KEYS[level], {})
+        level_headers.append(
+            {
+                "count": len(entries),
+                "pk_kind": pk_kind,
+                "extra_infos": _write_extra_infos(writer, level, entries, defs),
+            }
+        )
+    name_generator = sheet.name_generator
+    header = {
+        "identifier": sheet.identifier,
+        "title": sheet.title,
+        "description": sheet.description,
+        "extra_infos": sheet.extra_infos,
+        "name_pattern": getattr(name_generator, "pattern", None),
+        "pk_padding_length": getattr(name_generator, "pk_padding_length", None),
+        "levels": level_headers,
+    }
+    return writer.finish(header)
+
+
+def write_columnar(sheet, path):
+    """Write columnar representation of ``models.Sheet`` to ``path``
+
+    The file is replaced atomically.
+    """
+    data = build_columnar(sheet)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as outputf:
+            outputf.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Shared memory ---------------------------------------------------------------
+
+
+def _attach_shared_memory(name):
+    """Return ``SharedMemory`` for existing segment ``name`` without tracking it
+
+    The resource tracker would otherwise unlink the segment when the attaching
+    process exits.  Before Python 3.13, the segment is unregistered after
+    attaching, unless it was published by this process (or the parent it was
+    forked from) where the registration belongs to the publisher.  Children
+    started with "spawn" cannot tell and unregister, so the resource tracker
+    warns when the publisher unlinks the segment.
+    """
+    if not SHARED_MEMORY_AVAILABLE:
+        raise ColumnarSheetException("Shared memory requires Python 3.8 or later")
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no ``track``
+        pass
+    memory = shared_memory.SharedMemory(name=name)
+    if SHARED_MEMORY_TRACKED and memory.name not in _PUBLISHED_SEGMENTS:
+        resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+class SharedColumnarSheet:
+    """Columnar representation of ``models.Sheet`` published in shared memory
+
+    The publishing process owns the segment and must call ``close()`` (or use the
+    object as a context manager) to unlink it.  Other processes attach with
+    ``ColumnarSheet.attach(name, fingerprint)``.
+    """
+
+    def __init__(self, sheet, name=None):
+        if not SHARED_MEMORY_AVAILABLE:
+            raise ColumnarSheetException("Shared memory requires Python 3.8 or later")
+        data = build_columnar(sheet)
+        #: The ``multiprocessing.shared_memory.SharedMemory`` segment
+        self.shared_memory = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+        self.shared_memory.buf[: len(data)] = data
+        #: Name of the segment
+        self.name = self.shared_memory.name
+        _PUBLISHED_SEGMENTS.add(self.name)
+        #: Fingerprint of the published content
+        self.fingerprint = ColumnarSheet(data).fingerprint
+
+    def attach(self, dict_type=OrderedDict):
+        """Return ``ColumnarSheet`` attached to the segment"""
+        return ColumnarSheet.attach(self.name, self.fingerprint, dict_type)
+
+    def close(self):
+        """Close and unlink the segment"""
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+            _PUBLISHED_SEGMENTS.discard(self.name)
+            self.shared_memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return "SharedColumnarSheet({}, {})".format(self.name, self.fingerprint)
+
+    def __str__(self):
+        return repr(self)
+
+
+# Reading ---------------------------------------------------------------------
+
+
+def _read_header(buffer):
+    """Check prefix of columnar sheet in ``buffer`` and return its header
+
+    The memory view is released on errors such that shared memory can be closed.
+    """
+    with memoryview(buffer) as view:
+        if len(view) < _PREFIX.size:
+            raise ColumnarSheetException("Not a columnar sheet: too short")
+        magic, version, header_length, header_offset = _PREFIX.unpack_from(view, 0)
+        if magic != COLUMNAR_MAGIC:
+            raise ColumnarSheetException("Not a columnar sheet: invalid magic bytes")
+        elif version != COLUMNAR_FORMAT_VERSION:
+            raise ColumnarSheetException(
+                "Unsupported columnar sheet version {}, expected {}".format(
+                    version, COLUMNAR_FORMAT_VERSION
+                )
+            )
+        if header_offset + header_length > len(view):
+            raise ColumnarSheetException("Columnar sheet is truncated")
+        try:
+            header = json.loads(bytes(view[header_offset : header_offset + header_length]))
+        except ValueError as e:
+            raise ColumnarSheetException("Invalid columnar sheet header: {}".format(e)) from e
+    if not isinstance(header, dict):
+        raise ColumnarSheetException("Invalid columnar sheet header: not an object")
+    return header
+
+
+def _required_sections():
+    """Return names of the sections present in all columnar sheets"""
+    result = ["heap"]
+    for level in range(len(LEVEL_KEYS)):
+        names = ["pk", "disabled", "secondary_id", "extra_ids"]
+        if level > LEVEL_BIO_ENTITY:
+            names.append("parent")
+        if level < LEVEL_NGS_LIBRARY:
+            names.append("children")
+        result += ["{}.{}".format(level, name) for name in names]
+    return result
+
+
+class _Column:
+    """Extra info column of one level"""
+
+    __slots__ = ("key", "kind", "present", "values")
+
+    def __init__(self, key, kind, present, values):
+        self.key = key
+        self.kind = kind
+        self.present = present
+        self.values = values
+
+
+class ColumnarSheet(models.CrawlMixin):
+    """Read-only view on the columnar representation in ``buffer``
+
+    ``buffer`` can be any object supporting the buffer protocol, e.g., the
+    result of ``build_columnar()`` or an ``mmap``.  Use ``open()`` for
+    opening files.  The attribute API follows ``models.Sheet``, the entries
+    are ``BioEntityView``, ``BioSampleView``, ``TestSampleView``, and
+    ``NGSLibraryView`` objects that are created on first access.
+    """
+
+    def __init__(self, buffer, dict_type=OrderedDict):
+        #: The underlying buffer
+        self.buffer = buffer
+        header = _read_header(buffer)
+        self._sections = {}
+        try:
+            #: SHA-256 hex digest of the header and sections, ``None`` for files written without one
+            self.fingerprint = header.get("fingerprint")
+            #: Type to use for ``dict``-like objects
+            self.dict_type = dict_type
+            #: Identifier URI of the sheet
+            self.identifier = header["identifier"]
+            #: Title of the sheet
+            self.title = header["title"]
+            #: Description of the sheet
+            self.description = header["description"]
+            #: Extra info, ``dict``-like object
+            self.extra_infos = dict_type(header["extra_infos"] or [])
+            #: The JSON data is not stored in the columnar representation
+            self.json_data = None
+            #: Name generator used in the sheet
+            if header["name_pattern"]:
+                self.name_generator = PatternNameGenerator(
+                    header["name_pattern"], header["pk_padding_length"]
+                )
+            else:
+                self.name_generator = DEFAULT_NAME_GENERATOR
+            self._init_sections(header)
+        except (KeyError, TypeError, ValueError) as e:
+            self._release_sections()
+            raise ColumnarSheetException("Invalid columnar sheet header: {!r}".format(e)) from e
+        except BaseException:
+            # Release the sections such that the buffer can be closed
+            self._release_sections()
+            raise
+        # ``SharedMemory`` the buffer belongs to, set in ``attach()``
+        self._shared_memory = None
+        # Views by level and index, created on first access
+        self._views = tuple({} for _ in self.counts)
+        #: ``BioEntityView`` objects by secondary ID
+        self.bio_entities = _ChildMapping(self, LEVEL_BIO_ENTITY, 0, self.counts[0])
+
+    def _init_sections(self, header):
+        """Create the section views and extra info columns described in ``header``"""
+        sections = header["sections"]
+        if len(header["levels"]) != len(LEVEL_KEYS):
+            raise ColumnarSheetException("Invalid number of levels in columnar sheet")
+        missing = [name for name in _required_sections() if name not in sections]
+        if missing:
+            raise ColumnarSheetException(
+                "Columnar sheet lacks sections: {}".format(", ".join(missing))
+            )
+        with memoryview(self.buffer) as view:
+            for name, (offset, typecode, count) in sections.items():
+                end = offset + count * array(typecode).itemsize
+                if offset < _PREFIX.size or count < 0 or end > len(view):
+                    raise ColumnarSheetException("Section {} is out of bounds".format(name))
+                section = view[offset:end]
+                self._sections[name] = section.cast(typecode)
+                section.release()
+        self._heap = self._sections["heap"]
+        #: Number of entries per level
+        self.counts = tuple(level["count"] for level in header["levels"])
+        self._pk_kinds = tuple(level["pk_kind"] for level in header["levels"])
+        self._columns = tuple(
+            tuple(
+                _Column(
+                    key,
+                    kind,
+                    self._sections[prefix + ".present"],
+                    self._sections[prefix + ".values"],
+                )
+                for key, kind, prefix in level["extra_infos"]
+            )
+            for level in header["levels"]
+        )
+
+    def _release_sections(self):
+        for section in self._sections.values():
+            section.release()
+        self._sections = {}
+
+    @classmethod
+    def open(cls, path, dict_type=OrderedDict):
+        """Open columnar sheet file at ``path`` via ``mmap``"""
+        with open(path, "rb") as inputf:
+            buffer = mmap.mmap(inputf.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(buffer, dict_type)
+        except BaseException:
+            buffer.close()
+            raise
+
+    @classmethod
+    def attach(cls, name, fingerprint=None, dict_type=OrderedDict):
+        """Attach read-only to the shared memory segment ``name`` published with
+        ``SharedColumnarSheet``
+
+        Raises ``ColumnarSheetException`` if ``fingerprint`` is given and does not match
+        the one of the segment, i.e., the segment is stale.
+        """
+        memory = _attach_shared_memory(name)
+        buffer = memory.buf.toreadonly()
+        try:
+            result = cls(buffer, dict_type)
+            if fingerprint is not None and result.fingerprint != fingerprint:
+                result.close()
+                raise ColumnarSheetException(
+                    "Stale columnar sheet in shared memory {}: fingerprint {}, expected {}".format(
+                        name, result.fingerprint, fingerprint
+                    )
+                )
+        except BaseException:
+            buffer.release()
+            memory.close()
+            raise
+        result._shared_memory = memory
+        return result
+
+    @property
+    def sub_entries(self):
+        """Shortcut for ``crawl()``"""
+        return self.bio_entities
+
+    def view(self, level, idx):
+        """Return view object for the entry ``idx`` on ``level``"""
+        views = self._views[level]
+        result = views.get(idx)
+        if result is None:
+            result = views[idx] = VIEW_CLASSES[level](self, idx)
+        return result
+
+    def _int(self, level, name, idx):
+        return self._sections["{}.{}".format(level, name)][idx]
+
+    def _pk(self, level, idx):
+        if self._pk_kinds[level] == "int":
+            return self._int(level, "pk", idx)
+        else:
+            return json.loads(self._string("{}.pk".format(level), idx))
+
+    def _string(self, name, idx):
+        offsets = self._sections[name]
+        return str(self._heap[offsets[idx] : offsets[idx + 1]], "utf-8")
+
+    def _child_range(self, level, idx):
+        starts = self._sections["{}.children".format(level)]
+        return starts[idx], starts[idx + 1]
+
+    def _extra_ids(self, level, idx):
+        value = self._string("{}.extra_ids".format(level), idx)
+        return json.loads(value) if value else []
+
+    def _extra_infos(self, level, idx):
+        result = self.dict_type()
+        for column in self._columns[level]:
+            if column.present[idx]:
+                if column.kind == "bool":
+                    result[column.key] = bool(column.values[idx])
+                elif column.kind in ("int", "float"):
+                    result[column.key] = column.values[idx]
+                else:
+                    offsets = column.values
+                    value = str(self._heap[offsets[idx] : offsets[idx + 1]], "utf-8")
+                    result[column.key] = value if column.kind == "str" else json.loads(value)
+        return result
+
+    def close(self):
+        """Release the sections, closes the buffer if it is an ``mmap`` or shared memory"""
+        self._release_sections()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        elif self._shared_memory is not None:
+            self.buffer.release()
+            self._shared_memory.close()
+            self._shared_memory = None
+
+    def __repr__(self):
+        return "ColumnarSheet({})".format(
+            ", ".join(map(str, [self.identifier, self.title, self.description, self.counts]))
+        )
+
+    def __str__(self):
+        return repr(self)
+
+
+class _ChildMapping(Mapping):
+    """Mapping from secondary ID to view for a range of entries on one level"""
+
+    def __init__(self, sheet, level, start, stop):
+        self.sheet = sheet
+        self.level = level
+        self.start = start
+        self.stop = stop
+        # Mapping from secondary ID to index, built on first lookup
+        self._index = None
+
+    def _secondary_id(self, idx):
+        return self.sheet._string("{}.secondary_id".format(self.level), idx)
+
+    def __getitem__(self, key):
+        if self._index is None:
+            self._index = {self._secondary_id(i): i for i in range(self.start, self.stop)}
+        return self.sheet.view(self.level, self._index[key])
+
+    def __iter__(self):
+        for idx in range(self.start, self.stop):
+            yield self._secondary_id(idx)
+
+    def values(self):
+        return [self.sheet.view(self.level, idx) for idx in range(self.start, self.stop)]
+
+    def __len__(self):
+        return self.stop - self.start
+
+
+class EntryView:
+    """Base class for the read-only views on entries of ``ColumnarSheet``"""
+
+    __slots__ = ("sheet", "idx", "_extra_infos", "_name", "_child_mapping")
+
+    #: Level of the entries
+    level = None
+
+    def __init__(self, sheet, idx):
+        #: The ``ColumnarSheet``
+        self.sheet = sheet
+        #: Index on the level
+        self.idx = idx
+        self._extra_infos = None
+        self._name = None
+        self._child_mapping = None
+
+    @property
+    def pk(self):
+        return self.sheet._pk(self.level, self.idx)
+
+    @property
+    def disabled(self):
+        return bool(self.sheet._int(self.level, "disabled", self.idx))
+
+    @property
+    def enabled(self):
+        return not self.disabled
+
+    @property
+    def secondary_id(self):
+        return self.sheet._string("{}.secondary_id".format(self.level), self.idx)
+
+    @property
+    def extra_ids(self):
+        return self.sheet._extra_ids(self.level, self.idx)
+
+    @property
+    def extra_infos(self):
+        """Extra info, decoded on first access"""
+        if self._extra_infos is None:
+            self._extra_infos = self.sheet._extra_infos(self.level, self.idx)
+        return self._extra_infos
+
+    @property
+    def name_generator(self):
+        return self.sheet.name_generator
+
+    @property
+    def name(self):
+        if self._name is None:
+            self._name = self.sheet.name_generator(self)
+        return self._name
+
+    @property
+    def full_secondary_id(self):
+        parent = self._parent()
+        if parent is None:
+            return self.secondary_id
+        else:
+            return "-".join((parent.full_secondary_id, self.secondary_id))
+
+    def _parent(self):
+        if self.level == LEVEL_BIO_ENTITY:
+            return None
+        parent_idx = self.sheet._int(self.level, "parent", self.idx)
+        return self.sheet.view(self.level - 1, parent_idx)
+
+    def _children(self):
+        if self._child_mapping is None:
+            start, stop = self.sheet._child_range(self.level, self.idx)
+            self._child_mapping = _ChildMapping(self.sheet, self.level + 1, start, stop)
+        return self._child_mapping
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.sheet is self.sheet and other.idx == self.idx
+
+    def __hash__(self):
+        return hash((self.level, self.idx))
+
+    def __repr__(self):
+        return "{}({})".format(
+            type(self).__name__,
+            ", ".join(
+                map(
+                    str,
+                    [self.pk, self.disabled, self.secondary_id, self.extra_ids, self.extra_infos],
+                )
+            ),
+        )
+
+    def __str__(self):
+        return repr(self)
+
+
+class BioEntityView(EntryView, models.CrawlMixin):
+    """Read-only view with the API of ``models.BioEntity``"""
+
+    __slots__ = ()
+
+    level = LEVEL_BIO_ENTITY
+
+    @property
+    def bio_samples(self):
+        return self._children()
+
+    sub_entries = bio_samples
+
+
+class BioSampleView(EntryView, models.CrawlMixin):
+    """Read-only view with the API of ``models.BioSample``"""
+
+    __slots__ = ()
+
+    level = LEVEL_BIO_SAMPLE
+
+    @property
+    def bio_entity(self):
+        return self._parent()
+
+    @property
+    def test_samples(self):
+        return self._children()
+
+    sub_entries = test_samples
+
+
+class TestSampleView(EntryView, models.CrawlMixin):
+    """Read-only view with the API of ``models.TestSample``"""
+
+    __slots__ = ()
+
+    level = LEVEL_TEST_SAMPLE
+
+    @property
+    def bio_sample(self):
+        return self._parent()
+
+    @property
+    def ngs_libraries(self):
+        return self._children()
+
+    sub_entries = ngs_libraries
+
+
+class NGSLibraryView(EntryView):
+    """Read-only view with the API of ``models.NGSLibrary``"""
+
+    __slots__ = ()
+
+    level = LEVEL_NGS_LIBRARY
+
+    @property
+    def test_sample(self):
+        return self._parent()
+
+
+#: View classes by level
+VIEW_CLASSES = (BioEntityView, BioSampleView, TestSampleView, NGSLibraryView)
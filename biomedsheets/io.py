@@ -5,14 +5,36 @@ Optionally, objects can be validated before reading/writing.
 """
 
 from collections import OrderedDict
+from collections.abc import MutableMapping
+import contextlib
+import gc
+import hashlib
 import json
+import os
+import pickle
+import struct
+import tempfile
 
 from . import models
 from .naming import DEFAULT_NAME_GENERATOR
+from .version import __version__
 
 __author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
 
 
+#: Magic bytes at the start of sheet snapshot files
+SNAPSHOT_MAGIC = b"BMSHEET\x00"
+
+#: Version of the snapshot layout, bump on incompatible changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+#: Pickle protocol for snapshots
+SNAPSHOT_PICKLE_PROTOCOL = 5
+
+# Length of the header following the magic bytes
+_SNAPSHOT_HEADER_LENGTH = struct.Struct("<I")
+
+
 def json_loads_ordered(s):
     """Helper function to load JSON using OrderedDict for object pairs"""
     return json.loads(s, object_pairs_hook=OrderedDict)
@@ -31,31 +53,121 @@ class SheetSchema:
         self.parsed_json = parsed_json
 
 
+#: Keys of the entity types in "extraInfoDefs"
+EXTRA_INFO_ENTITY_TYPES = ("bioEntity", "bioSample", "testSample", "ngsLibrary")
+
+
 class ExtraInfoBuilder:
     """Helper class for converting from "extraInfo" value to Python value"""
 
+    #: Dispatch table for different types, mostly Python type constructors;
+    #: "array" is handled in ``compile()``
+    builders = {
+        "boolean": bool,
+        "string": str,
+        "pattern": str,
+        "integer": int,
+        "number": float,
+        "enum": str,
+        "object": lambda x: x,  # identity
+    }
+
     def __init__(self, definition):
-        #: Dispatch table for different types, mostly Python type constructors
-        self.builders = {
-            "boolean": bool,
-            "string": str,
-            "pattern": str,
-            "integer": int,
-            "number": float,
-            "enum": str,
-            "object": lambda x: x,  # identity
-            "array": self._build_array,
-        }
         #: Definition from JSON file
         self.definition = definition
+        #: Converter function for the definition
+        self.func = self.compile(definition)
 
     def build(self, value):
-        return self.builders[self.definition["type"]](value)
+        return self.func(value)
+
+    @classmethod
+    def compile(cls, definition):
+        """Return converter function for the given extra info ``definition``"""
+        if definition["type"] == "array":
+            func = cls.builders[definition["entry"]]
+            return lambda value: list(map(func, value))
+        else:
+            return cls.builders[definition["type"]]
+
+
+class ExtraInfoConverters(dict):
+    """Mapping from extra info key to converter function
+
+    The converters are compiled from ``definitions`` on first use such that
+    definitions not used by any value are not interpreted.
+    """
+
+    def __init__(self, definitions):
+        super().__init__()
+        #: The "extraInfoDefs" entries of one entity type
+        self.definitions = definitions
+
+    def __missing__(self, key):
+        func = self[key] = ExtraInfoBuilder.compile(self.definitions[key])
+        return func
+
+
+def compile_extra_info_defs(extra_infos_defs):
+    """Compile "extraInfoDefs" into a converter table
+
+    The result maps each entity type key (e.g., ``"bioEntity"``) to an
+    ``ExtraInfoConverters`` from extra info key to converter function.
+    """
+    return {
+        entity_type: ExtraInfoConverters(extra_infos_defs.get(entity_type, {}))
+        for entity_type in EXTRA_INFO_ENTITY_TYPES
+    }
 
-    def _build_array(self, value):
-        """Handle array entry type"""
-        func = self.builders[self.definition["entry"]]
-        return list(map(func, value))
+
+class LazyBioEntities(MutableMapping):
+    """Mapping from secondary ID to ``BioEntity`` that builds the entities
+    from the JSON data on first access
+
+    The order of the JSON data is kept, values can be assigned and deleted
+    as for a ``dict``.
+    """
+
+    def __init__(self, build, bio_entities_json, dict_type=OrderedDict):
+        #: Function building ``BioEntity`` from secondary ID and JSON value
+        self.build = build
+        #: JSON data of the bio entities
+        self.bio_entities_json = bio_entities_json
+        # Mapping from secondary ID to ``BioEntity``, ``None`` if not built yet
+        self._entries = dict_type.fromkeys(bio_entities_json)
+
+    @property
+    def built_count(self):
+        """Number of ``BioEntity`` objects built or assigned so far"""
+        return sum(1 for value in self._entries.values() if value is not None)
+
+    def __getitem__(self, key):
+        value = self._entries[key]
+        if value is None:
+            value = self._entries[key] = self.build(key, self.bio_entities_json[key])
+        return value
+
+    def __setitem__(self, key, value):
+        self._entries[key] = value
+
+    def __delitem__(self, key):
+        del self._entries[key]
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "LazyBioEntities({} of {} built)".format(self.built_count, len(self))
+
+    def __reduce__(self):
+        # Pickle as fully built mapping, the build function cannot be pickled
+        return (type(self._entries), (list(self.items()),))
 
 
 class SheetBuilder:
@@ -70,14 +182,23 @@ class SheetBuilder:
         #: Validated BioMed Sheet data
         self.json_data = json_data
 
-    def run(self, dict_type=OrderedDict, name_generator=DEFAULT_NAME_GENERATOR):
-        return models.Sheet(
+    def run(self, dict_type=OrderedDict, name_generator=DEFAULT_NAME_GENERATOR, lazy=False):
+        """Build and return ``models.Sheet``
+
+        With ``lazy=True``, the ``BioEntity`` objects are only built on first
+        access, see ``LazyBioEntities``.
+        """
+        converters = compile_extra_info_defs(self.json_data.get("extraInfoDefs", dict_type()))
+        bio_entities_json = self.json_data.get("bioEntities", dict_type())
+        sheet = models.Sheet(
             identifier=self.json_data.get("identifier", ""),
             title=self.json_data.get("title", ""),
             description=self.json_data.get("description", ""),
-            bio_entities=self._build_bio_entities(
-                extra_infos_defs=self.json_data.get("extraInfoDefs", dict_type()),
-                bio_entities_json=self.json_data.get("bioEntities", dict_type()),
+            bio_entities=None
+            if lazy
+            else self._build_bio_entities(
+                converters=converters,
+                bio_entities_json=bio_entities_json,
                 dict_type=dict_type,
                 name_generator=name_generator,
             ),
@@ -85,43 +206,60 @@ class SheetBuilder:
             dict_type=dict_type,
             name_generator=name_generator,
         )
+        if lazy:
 
-    def _build_bio_entities(self, extra_infos_defs, bio_entities_json, dict_type, name_generator):
+            def build(secondary_id, value):
+                return self._build_bio_entity(
+                    converters, secondary_id, value, dict_type, name_generator
+                )
+
+            sheet.bio_entities = LazyBioEntities(build, bio_entities_json, dict_type)
+        return sheet
+
+    def _build_bio_entities(self, converters, bio_entities_json, dict_type, name_generator):
         """Build BioEntity list"""
         for secondary_id, value in bio_entities_json.items():
-            bio_entity = models.BioEntity(
-                pk=value["pk"],
-                disabled=value.get("disabled", False),
-                secondary_id=secondary_id,
-                extra_ids=value.get("extraIds", []),
-                extra_infos=dict_type(
-                    self._build_extra_infos(
-                        extra_infos=value.get("extraInfo", dict_type()),
-                        extra_infos_defs=extra_infos_defs.get("bioEntity", dict_type()),
-                        dict_type=dict_type,
-                        name_generator=name_generator,
-                    )
-                ),
-                bio_samples=dict_type(
-                    self._build_bio_samples(
-                        extra_infos_defs=extra_infos_defs,
-                        bio_samples_json=value.get("bioSamples", dict_type()),
-                        dict_type=dict_type,
-                        name_generator=name_generator,
-                    )
-                ),
-                dict_type=dict_type,
-                name_generator=name_generator,
+            yield (
+                secondary_id,
+                self._build_bio_entity(converters, secondary_id, value, dict_type, name_generator),
             )
-            yield (secondary_id, bio_entity)
+
+    def _build_bio_entity(self, converters, secondary_id, value, dict_type, name_generator):
+        """Build one BioEntity, including all entries below"""
+        return models.BioEntity(
+            pk=value["pk"],
+            disabled=value.get("disabled", False),
+            secondary_id=secondary_id,
+            extra_ids=value.get("extraIds", []),
+            extra_infos=dict_type(
+                self._build_extra_infos(
+                    extra_infos=value.get("extraInfo", dict_type()),
+                    converters=converters["bioEntity"],
+                )
+            ),
+            bio_samples=dict_type(
+                self._build_bio_samples(
+                    converters=converters,
+                    bio_samples_json=value.get("bioSamples", dict_type()),
+                    dict_type=dict_type,
+                    name_generator=name_generator,
+                )
+            ),
+            dict_type=dict_type,
+            name_generator=name_generator,
+        )
 
     @classmethod
-    def _build_extra_infos(cls, extra_infos_defs, extra_infos, dict_type, name_generator):
-        """Interpret extraInfo stuff, including type conversion"""
+    def _build_extra_infos(cls, converters, extra_infos):
+        """Interpret extraInfo stuff, including type conversion
+
+        ``converters`` maps the extra info keys to converter functions, see
+        ``compile_extra_info_defs()``
+        """
         for key, value in extra_infos.items():
-            yield (key, ExtraInfoBuilder(extra_infos_defs[key]).build(value))
+            yield (key, converters[key](value))
 
-    def _build_bio_samples(self, extra_infos_defs, bio_samples_json, dict_type, name_generator):
+    def _build_bio_samples(self, converters, bio_samples_json, dict_type, name_generator):
         """Build models.BioSample object, root JSON is required for attribute
         description
         """
@@ -134,14 +272,12 @@ class SheetBuilder:
                 extra_infos=dict_type(
                     self._build_extra_infos(
                         extra_infos=value.get("extraInfo", dict_type()),
-                        extra_infos_defs=extra_infos_defs.get("bioSample", dict_type()),
-                        dict_type=dict_type,
-                        name_generator=name_generator,
+                        converters=converters["bioSample"],
                     )
                 ),
                 test_samples=dict_type(
                     self._build_test_samples(
-                        extra_infos_defs,
+                        converters,
                         value.get("testSamples", dict_type()),
                         dict_type,
                         name_generator,
@@ -152,7 +288,7 @@ class SheetBuilder:
             )
             yield (secondary_id, bio_sample)
 
-    def _build_test_samples(self, extra_infos_defs, test_samples_json, dict_type, name_generator):
+    def _build_test_samples(self, converters, test_samples_json, dict_type, name_generator):
         """Build models.TestSample object"""
         for secondary_id, value in test_samples_json.items():
             test_sample = models.TestSample(
@@ -163,14 +299,12 @@ class SheetBuilder:
                 extra_infos=dict_type(
                     self._build_extra_infos(
                         extra_infos=value.get("extraInfo", dict_type()),
-                        extra_infos_defs=extra_infos_defs.get("testSample", dict_type()),
-                        dict_type=dict_type,
-                        name_generator=name_generator,
+                        converters=converters["testSample"],
                     )
                 ),
                 ngs_libraries=dict_type(
                     self._build_ngs_libraries(
-                        extra_infos_defs=extra_infos_defs,
+                        converters=converters,
                         ngs_libraries_json=value.get("ngsLibraries", dict_type()),
                         dict_type=dict_type,
                         name_generator=name_generator,
@@ -181,7 +315,7 @@ class SheetBuilder:
             )
             yield (secondary_id, test_sample)
 
-    def _build_ngs_libraries(self, extra_infos_defs, ngs_libraries_json, dict_type, name_generator):
+    def _build_ngs_libraries(self, converters, ngs_libraries_json, dict_type, name_generator):
         """Build models.NGSLibrary objects"""
         for secondary_id, value in ngs_libraries_json.items():
             ngs_library = models.NGSLibrary(
@@ -192,12 +326,93 @@ class SheetBuilder:
                 extra_infos=dict_type(
                     self._build_extra_infos(
                         extra_infos=value.get("extraInfo", dict_type()),
-                        extra_infos_defs=extra_infos_defs.get("ngsLibrary", dict_type()),
-                        dict_type=dict_type,
-                        name_generator=name_generator,
+                        converters=converters["ngsLibrary"],
                     )
                 ),
                 dict_type=dict_type,
                 name_generator=name_generator,
             )
             yield (secondary_id, ngs_library)
+
+
+def file_sha256(path):
+    """Return hex SHA256 digest of the file at ``path``"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as inputf:
+        for chunk in iter(lambda: inputf.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_snapshot(sheet, path, source_path=None):
+    """Write ``models.Sheet`` to binary snapshot file at ``path``
+
+    The snapshot consists of magic bytes, a header with the format and
+    package version and the SHA256 digest of ``source_path`` (if given),
+    followed by the pickled sheet.  The file is replaced atomically.
+    Lazily built bio entities are built for the snapshot.
+    """
+    header = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "package_version": __version__,
+        "source_sha256": file_sha256(source_path) if source_path else None,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    with _gc_disabled():
+        payload = pickle.dumps(sheet, protocol=SNAPSHOT_PICKLE_PROTOCOL)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as outputf:
+            outputf.write(SNAPSHOT_MAGIC)
+            outputf.write(_SNAPSHOT_HEADER_LENGTH.pack(len(header_bytes)))
+            outputf.write(header_bytes)
+            outputf.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_snapshot(path, source_path=None):
+    """Load ``models.Sheet`` from snapshot file at ``path``
+
+    Returns ``None`` if the file does not exist, is not a snapshot, was
+    written by another format or package version, or if ``source_path`` is
+    given and its SHA256 digest differs from the one stored on writing.
+    The sheet is unpickled, only load snapshots from trusted locations.
+    """
+    try:
+        with open(path, "rb") as inputf:
+            data = inputf.read()
+    except FileNotFoundError:
+        return None
+    offset = len(SNAPSHOT_MAGIC) + _SNAPSHOT_HEADER_LENGTH.size
+    if len(data) < offset or not data.startswith(SNAPSHOT_MAGIC):
+        return None
+    (header_length,) = _SNAPSHOT_HEADER_LENGTH.unpack_from(data, len(SNAPSHOT_MAGIC))
+    try:
+        header = json.loads(data[offset : offset + header_length].decode("utf-8"))
+    except ValueError:
+        return None
+    if (
+        header.get("format_version") != SNAPSHOT_FORMAT_VERSION
+        or header.get("package_version") != __version__
+    ):
+        return None
+    elif source_path and header.get("source_sha256") != file_sha256(source_path):
+        return None
+    with _gc_disabled():  # unpickling creates many objects, avoid repeated collections
+        return pickle.loads(memoryview(data)[offset + header_length :])
+
+
+@contextlib.contextmanager
+def _gc_disabled():
+    """Context manager disabling the cyclic garbage collector temporarily"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
@@ -3,10 +3,15 @@
 """
 
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import itertools
 import re
+import threading
 
 from .. import io, ref_resolver
 from ..naming import NAMING_DEFAULT, name_generator_for_scheme
+from ..version import __version__
 
 __author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
 
@@ -90,6 +95,23 @@ BOOL_VALUES = {
 #: NCBI taxon for human
 NCBI_TAXON_HUMAN = "NCBITaxon_9606"
 
+#: Values in TSV data rows that are interpreted as empty field
+NULL_VALUES = (".", "")
+
+#: Converters for custom fields by field type, other types are kept as ``str``
+FIELD_TYPE_CONVERTERS = {
+    "integer": int,
+    "number": float,
+    "boolean": lambda x: BOOL_VALUES.get(x, False),
+}
+
+#: Process-wide cache of resolved ``extra_info_defs``, keyed by reader class
+#: and package version
+_EXTRA_INFO_DEFS_CACHE = {}
+
+#: Lock guarding ``_EXTRA_INFO_DEFS_CACHE``
+_EXTRA_INFO_DEFS_CACHE_LOCK = threading.Lock()
+
 
 class SheetIOException(Exception):
     """Raised on problems with loading sample sheets"""
@@ -105,6 +127,48 @@ def std_field(name):
     return (name, OrderedDict([("$ref", tpl.format(name))]))
 
 
+def clear_extra_info_defs_cache():
+    """Clear the process-wide cache of resolved ``extra_info_defs``"""
+    with _EXTRA_INFO_DEFS_CACHE_LOCK:
+        _EXTRA_INFO_DEFS_CACHE.clear()
+
+
+def _copy_json(obj):
+    """Return copy of the JSON containers in ``obj``, atomic values are shared"""
+    if isinstance(obj, dict):
+        return obj.__class__((key, _copy_json(value)) for key, value in obj.items())
+    elif isinstance(obj, list):
+        return [_copy_json(value) for value in obj]
+    else:
+        return obj
+
+
+def _build_bio_entities_json_batch(reader_class, fname, batch, extra_info_defs):
+    """Build bio entity JSON for ``(name, records)`` in ``batch`` with PKs
+    starting at 1, for use in worker processes
+
+    Return pair of list of ``(name, bio_entity_json)`` and number of used PKs.
+    """
+    reader = reader_class(None, fname)
+    result = [
+        (name, reader._build_bio_entity_json(records, extra_info_defs)) for name, records in batch
+    ]
+    return result, reader.next_pk - 1
+
+
+def _shift_pks(bio_entity_json, offset):
+    """Add ``offset`` to all PKs in ``bio_entity_json`` in place and return it"""
+    if offset:
+        bio_entity_json["pk"] += offset
+        for bio_sample_json in bio_entity_json["bioSamples"].values():
+            bio_sample_json["pk"] += offset
+            for test_sample_json in bio_sample_json["testSamples"].values():
+                test_sample_json["pk"] += offset
+                for ngs_library_json in test_sample_json["ngsLibraries"].values():
+                    ngs_library_json["pk"] += offset
+    return bio_entity_json
+
+
 class TSVMetadata:
     """Meta data information"""
 
@@ -309,18 +373,36 @@ class BaseTSVReader:
     ngs_library_name_column = None
     #: Single extraction type if given
     extraction_type = None
+    #: Whether to use the process-wide cache for the resolved
+    #: ``extra_info_defs``, set to ``False`` to resolve on every conversion
+    cache_extra_info_defs = True
 
     def __init__(self, f, fname=None):
         self.f = f
         self.fname = fname or "<unknown>"
         self.next_pk = 1
 
-    def read_json_data(self):
+    def read_json_data(self, streaming=False, processes=None):
         """Read from file-like object ``self.f``, use file name in case of
         problems
 
+        If ``streaming`` is ``True`` then the lines are consumed one by one
+        and each bio entity's JSON is built as soon as its rows have been
+        read, see :py:meth:`stream_json_data`.
+
+        If ``processes`` is greater than one then the bio entity JSON is
+        built in that many worker processes.  The result, including the
+        PKs, is the same as in the serial case.  The reader class must be
+        constructible as ``cls(f, fname)`` for this.
+
         :raises:TSVSheetException in case of problems
         """
+        if streaming and processes and processes > 1:
+            raise ValueError("Cannot combine streaming and multi-process reading")
+        elif streaming:
+            json_data, bio_entities = self.stream_json_data()
+            json_data["bioEntities"].update(bio_entities)
+            return self.postprocess_json_data(json_data)
         # Read lines from file and check for file not being empty
         lines = [line.strip() for line in self.f]
         if not lines:
@@ -335,9 +417,54 @@ class BaseTSVReader:
             body = lines
         # Process header and then create a models.Sheet
         tsv_header = TSVHeaderParser(header).run()
-        body_header = body[0].split("\t")
+        self._check_body_header(tsv_header, body[0].split("\t") if body else [])
+        return self._create_sheet_json(tsv_header, body, processes)
+
+    def stream_json_data(self):
+        """Read from file-like object ``self.f`` without loading all lines
+
+        The header is parsed eagerly, the ``[Data]`` rows are consumed
+        lazily.  Return pair of the sheet JSON (with empty ``"bioEntities"``)
+        and an iterator of ``(name, bio_entity_json)`` pairs.  Each pair is
+        yielded as soon as the rows of its bio entity are complete, so the
+        rows of each bio entity must be contiguous.  The caller is
+        responsible for calling :py:meth:`postprocess_json_data` after
+        filling ``"bioEntities"`` if needed.
+
+        :raises:TSVSheetException in case of problems
+        """
+        lines = (line.strip() for line in self.f)
+        first = next(lines, None)
+        if first is None:
+            raise TSVSheetException(
+                "Problem loading TSV sheet in file {}".format(self.fname)
+            )  # pragma: no cover
+        # Decide between the case with or without header
+        header = []
+        if first.startswith("["):
+            line = first
+            while line is not None:
+                if not line.startswith("#"):  # skip comments
+                    header.append(line)
+                    if line.startswith("[Data]"):
+                        break
+                line = next(lines, None)
+            body = (line for line in lines if not line.startswith("#"))
+        else:
+            body = itertools.chain([first], lines)
+        # Process header and body header line, then records lazily
+        tsv_header = TSVHeaderParser(header).run()
+        names_line = next(body, None)
+        names = names_line.split("\t") if names_line is not None else []
+        self._check_body_header(tsv_header, names)
+        json_data, extra_info_defs = self._create_sheet_json_head(tsv_header)
+        records = self._iter_records(tsv_header, names, body)
+        return json_data, self._iter_bio_entities_json(records, extra_info_defs)
+
+    def _check_body_header(self, tsv_header, body_header):
+        """Check column names in ``body_header`` against the expected ones"""
         missing_columns = set(self.__class__.body_header) - set(body_header)
-        if not body or missing_columns:
+        if not body_header or missing_columns:
             raise TSVSheetException(
                 (
                     "Empty or invalid data column names in TSV sheet file {}. "
@@ -356,12 +483,13 @@ class BaseTSVReader:
         if extra_columns:
             msg = "Unexpected column seen in header row of body: {}"
             raise TSVSheetException(msg.format(", ".join(sorted(extra_columns))))
-        return self._create_sheet_json(tsv_header, body)
 
-    def read_sheet(self, name_generator=None):
+    def read_sheet(self, name_generator=None, streaming=False, processes=None):
         """Read into JSON and construct ``models.Sheet``"""
         self.name_generator = name_generator or name_generator_for_scheme(NAMING_DEFAULT)
-        return io.SheetBuilder(self.read_json_data()).run(name_generator=name_generator)
+        return io.SheetBuilder(self.read_json_data(streaming=streaming, processes=processes)).run(
+            name_generator=name_generator
+        )
 
     def _split_lines(self, lines):
         """Split string array lines into header and body"""
@@ -378,56 +506,166 @@ class BaseTSVReader:
                     in_data = True
         return header, body
 
-    def _create_sheet_json(self, tsv_header, body):
+    def _create_sheet_json(self, tsv_header, body, processes=None):
         """Create models.Sheet object from header dictionary and body lines"""
         names = body[0].split("\t")  # idx to name
         # Build validated list of records
-        records = []
-        for lineno, line in enumerate(body[1:]):
-            arr = line.split("\t")
+        records = list(self._iter_records(tsv_header, names, body[1:]))
+        # Create the sheet from records
+        return self._create_sheet_json_from_records(tsv_header, records, processes)
+
+    def _iter_records(self, tsv_header, names, lines):
+        """Yield validated records from data section ``lines``"""
+        # Call ``convert_tsv_line()`` only if it is overridden, the default
+        # conversions are part of the row plan
+        if self.__class__.convert_tsv_line.__func__ is BaseTSVReader.convert_tsv_line.__func__:
+            convert_tsv_line = None
+        else:
+            convert_tsv_line = self.convert_tsv_line
+        row_plan = self._compile_row_plan(tsv_header, names, not convert_tsv_line)
+        num_names = len(names)
+        # Skip the per-line hook if it is not overridden
+        if self.__class__.check_tsv_line is BaseTSVReader.check_tsv_line:
+            check_tsv_line = None
+        else:
+            check_tsv_line = self.check_tsv_line
+        for lineno, line in enumerate(lines):
             # Replace '.' and '' with ``None``, for empty field
-            arr = [(x if x not in (".", "") else None) for x in arr]
+            arr = [(x if x not in NULL_VALUES else None) for x in line.split("\t")]
             # Check number of entries in line
-            if len(arr) != len(names):
+            if len(arr) != num_names:
                 msg = "Invalid number of entries in line {} of data " "section of {}: {} vs {}"
                 raise TSVSheetException(
                     msg.format(lineno + 2, self.fname, arr, names)
                 )  # pragma: no cover
-            mapping = dict(zip(names, arr))
-            mapping = self.convert_tsv_line(mapping, tsv_header)
-            self.check_tsv_line(mapping, lineno)
-            records.append(mapping)
-        # Create the sheet from records
-        return self._create_sheet_json_from_records(tsv_header, records)
+            if convert_tsv_line:
+                mapping = convert_tsv_line(dict(zip(names, arr)), tsv_header)
+                for idx, func in row_plan:
+                    mapping[names[idx]] = func(mapping[names[idx]], lineno)
+            else:
+                for idx, func in row_plan:
+                    arr[idx] = func(arr[idx], lineno)
+                mapping = dict(zip(names, arr))
+            if check_tsv_line:
+                check_tsv_line(mapping, lineno)
+            yield mapping
+
+    def _compile_row_plan(self, tsv_header, names, convert=True):
+        """Compile data section header ``names`` into tuple of ``(index, func)``
+
+        Each ``func`` is called as ``func(value, lineno)`` and returns the
+        converted value of the column at ``index``.  The custom field type
+        conversions come first (unless ``convert`` is ``False``), followed by
+        :py:meth:`column_checks`.
+        """
+        column_idx = {name: idx for idx, name in enumerate(names)}
+        row_plan = []
+        for name in names if convert else ():
+            info = tsv_header.custom_field_infos.get(name)
+            if info and info.field_type in FIELD_TYPE_CONVERTERS:
+                row_plan.append(
+                    (
+                        column_idx[name],
+                        self._convert_non_null(FIELD_TYPE_CONVERTERS[info.field_type]),
+                    )
+                )
+        for name, func in self.column_checks():
+            if name in column_idx:
+                row_plan.append((column_idx[name], func))
+        return tuple(row_plan)
+
+    @staticmethod
+    def _convert_non_null(func):
+        """Return ``(value, lineno)`` converter applying ``func`` to non-``None`` values"""
+
+        def convert(value, _lineno):
+            return value if value is None else func(value)
+
+        return convert
 
     @classmethod
     def convert_tsv_line(cls, mapping, tsv_header):
-        """Convert fields in TSV line after conversion to mapping"""
+        """Convert fields in TSV line after conversion to mapping
+
+        The default conversions are compiled into the row plan, overrides in sub
+        classes are called for each line before the :py:meth:`column_checks`.
+        """
         custom_field_infos = tsv_header.custom_field_infos
-        table = {
-            "integer": int,
-            "number": float,
-            "boolean": lambda x: BOOL_VALUES.get(x, False),
-        }
         for key, value in mapping.items():
             if value is not None and key in custom_field_infos:
-                mapping[key] = table.get(custom_field_infos[key].field_type, lambda x: x)(value)
+                mapping[key] = FIELD_TYPE_CONVERTERS.get(
+                    custom_field_infos[key].field_type, lambda x: x
+                )(value)
         return mapping
 
+    def column_checks(self):
+        """Return list of ``(column, func)`` pairs for checking and converting
+        single columns of the data section
+
+        ``func`` is called as ``func(value, lineno)`` with the value after
+        replacing empty fields by ``None`` and must return the (possibly
+        converted) value or raise an exception.  The functions are applied in
+        the order of the list.  Override in sub classes.
+        """
+        return []
+
     def check_tsv_line(self, mapping, lineno):
         """Check TSV line after conversion into mapping
 
-        Override in sub classes
+        Called after the :py:meth:`column_checks`, override in sub classes
+        for checks that span multiple columns.
         """
-        raise NotImplementedError("Override in sub class")  # pragma: no cover
 
-    def _create_sheet_json_from_records(self, tsv_header, records):
+    def _create_sheet_json_from_records(self, tsv_header, records, processes=None):
         """Create a new models.Sheet object from TSV records"""
-        furl = "file://{}".format(self.fname)
-        resolver = ref_resolver.RefResolver(dict_class=OrderedDict)
-        extra_info_defs = self._augment_extra_info_defs(
-            resolver.resolve(furl, self.__class__.extra_info_defs), tsv_header
+        json_data, extra_info_defs = self._create_sheet_json_head(tsv_header)
+        records_by_bio_entity = OrderedDict()  # records by bio entity
+        for record in records:
+            records_by_bio_entity.setdefault(record[self.__class__.bio_entity_name_column], [])
+            records_by_bio_entity[record[self.__class__.bio_entity_name_column]].append(record)
+        if processes and processes > 1:
+            json_data["bioEntities"].update(
+                self._build_bio_entities_json_parallel(
+                    records_by_bio_entity, extra_info_defs, processes
+                )
+            )
+        else:
+            for bio_entity_name, records in records_by_bio_entity.items():
+                json_data["bioEntities"][bio_entity_name] = self._build_bio_entity_json(
+                    records, extra_info_defs
+                )
+        return self.postprocess_json_data(json_data)
+
+    def _build_bio_entities_json_parallel(self, records_by_bio_entity, extra_info_defs, processes):
+        """Yield ``(name, bio_entity_json)`` built in ``processes`` worker processes
+
+        The bio entities are split into contiguous batches, each worker
+        numbers its batch starting with PK 1.  The batches are then shifted
+        by the number of PKs used by the preceding batches, giving the same
+        PKs as building all bio entities serially.
+        """
+        items = list(records_by_bio_entity.items())
+        batch_size = max(1, -(-len(items) // (processes * 4)))
+        batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+        worker = functools.partial(
+            _build_bio_entities_json_batch,
+            self.__class__,
+            self.fname,
+            extra_info_defs=extra_info_defs,
         )
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for bio_entities, num_pks in executor.map(worker, batches):
+                offset = self.next_pk - 1
+                for bio_entity_name, bio_entity_json in bio_entities:
+                    yield bio_entity_name, _shift_pks(bio_entity_json, offset)
+                self.next_pk += num_pks
+
+    def _create_sheet_json_head(self, tsv_header):
+        """Return pair of sheet JSON without bio entities and the extra info
+        definitions
+        """
+        furl = "file://{}".format(self.fname)
+        extra_info_defs = self._augment_extra_info_defs(self._get_extra_info_defs(furl), tsv_header)
         json_data = OrderedDict(
             [
                 ("identifier", furl),
@@ -440,15 +678,43 @@ class BaseTSVReader:
                 ("bioEntities", OrderedDict()),
             ]
         )
-        records_by_bio_entity = OrderedDict()  # records by bio entity
-        for record in records:
-            records_by_bio_entity.setdefault(record[self.__class__.bio_entity_name_column], [])
-            records_by_bio_entity[record[self.__class__.bio_entity_name_column]].append(record)
-        for bio_entity_name, records in records_by_bio_entity.items():
-            json_data["bioEntities"][bio_entity_name] = self._build_bio_entity_json(
-                records, extra_info_defs
-            )
-        return self.postprocess_json_data(json_data)
+        return json_data, extra_info_defs
+
+    def _iter_bio_entities_json(self, records, extra_info_defs):
+        """Yield ``(name, bio_entity_json)`` for each run of records with the
+        same bio entity name
+        """
+        column = self.__class__.bio_entity_name_column
+        seen = set()
+        for bio_entity_name, sub_records in itertools.groupby(records, lambda r: r[column]):
+            if bio_entity_name in seen:
+                raise TSVSheetException(
+                    "Rows for {} {} are not contiguous in {}, cannot read in streaming mode".format(
+                        column, bio_entity_name, self.fname
+                    )
+                )
+            seen.add(bio_entity_name)
+            yield bio_entity_name, self._build_bio_entity_json(list(sub_records), extra_info_defs)
+
+    def _get_extra_info_defs(self, furl):
+        """Return copy of the resolved ``extra_info_defs`` of the class
+
+        The resolved definitions are cached process-wide unless
+        ``cache_extra_info_defs`` is ``False``.
+        """
+        if not self.cache_extra_info_defs:
+            return self._resolve_extra_info_defs(furl)
+        key = (self.__class__, __version__)
+        with _EXTRA_INFO_DEFS_CACHE_LOCK:
+            if key not in _EXTRA_INFO_DEFS_CACHE:
+                _EXTRA_INFO_DEFS_CACHE[key] = self._resolve_extra_info_defs(furl)
+            extra_info_defs = _EXTRA_INFO_DEFS_CACHE[key]
+        return _copy_json(extra_info_defs)
+
+    def _resolve_extra_info_defs(self, furl):
+        """Resolve the ``$ref`` entries in the class' ``extra_info_defs``"""
+        resolver = ref_resolver.RefResolver(dict_class=OrderedDict)
+        return resolver.resolve(furl, self.__class__.extra_info_defs)
 
     @classmethod
     def _augment_extra_info_defs(cls, extra_info_defs, tsv_header):
@@ -85,39 +85,59 @@ class CancerTSVReader(BaseTSVReader):
     bio_entity_name_column = "patientName"
     bio_sample_name_column = "sampleName"
 
-    def check_tsv_line(self, mapping, lineno):
+    def column_checks(self):
         """Cancer sample sheet--specific valiation"""
-        # Check for hyphen in patient or sample name
-        if "-" in mapping["patientName"]:
-            raise CancerTSVSheetException(
-                "Hyphen not allowed in patientName column"
-            )  # pragma: no cover
-        if "-" in mapping["sampleName"]:
-            raise CancerTSVSheetException(
-                "Hyphen not allowed in sampleName column"
-            )  # pragma: no cover
-        # Check "isTumor" field, convert to bool
-        if mapping["isTumor"] not in BOOL_VALUES.keys():
+        # TODO: we should perform more validation here in the future
+        return [
+            ("patientName", self._check_no_hyphen("patientName")),
+            ("sampleName", self._check_no_hyphen("sampleName")),
+            ("isTumor", self._check_is_tumor),
+            ("libraryType", self._check_library_type),
+        ] + [(key, self._check_non_empty(key)) for key in self.__class__.body_header]
+
+    @staticmethod
+    def _check_no_hyphen(key):
+        """Return check for hyphen in patient or sample name field ``key``"""
+
+        def check(value, lineno):
+            if value and "-" in value:
+                raise CancerTSVSheetException(
+                    "Hyphen not allowed in {} column".format(key)
+                )  # pragma: no cover
+            return value
+
+        return check
+
+    def _check_is_tumor(self, value, lineno):
+        """Check "isTumor" field, convert to bool"""
+        if value not in BOOL_VALUES:
             raise CancerTSVSheetException(  # pragma: no cover
                 ("Invalid boolean value {} in line {} " "of data section of {}").format(
-                    mapping["isTumor"], lineno + 2, self.fname
+                    value, lineno + 2, self.fname
                 )
             )
-        mapping["isTumor"] = BOOL_VALUES[mapping["isTumor"]]
-        # Check "libraryType" field
-        if mapping["libraryType"] not in LIBRARY_TYPES:
+        return BOOL_VALUES[value]
+
+    @staticmethod
+    def _check_library_type(value, lineno):
+        """Check "libraryType" field"""
+        if value not in LIBRARY_TYPES:
             raise CancerTSVSheetException(  # pragma: no cover
-                "Invalid library type {}, must be in {{{}}}".format(
-                    mapping["libraryType"], ", ".join(LIBRARY_TYPES)
-                )
+                "Invalid library type {}, must be in {{{}}}".format(value, ", ".join(LIBRARY_TYPES))
             )
-        # Check other fields for being non-empty
-        for key in self.__class__.body_header:
-            if mapping[key] is None:
+        return value
+
+    def _check_non_empty(self, key):
+        """Return check for field ``key`` being non-empty"""
+
+        def check(value, lineno):
+            if value is None:
                 raise CancerTSVSheetException(
                     "Field {} empty in line {} of {}".format(key, lineno + 2, self.fname)
                 )  # pragma: no cover
-        # TODO: we should perform more validation here in the future
+            return value
+
+        return check
 
     def construct_bio_entity_dict(self, records, extra_info_defs):
         result = super().construct_bio_entity_dict(records, extra_info_defs)
@@ -72,28 +72,48 @@ class GenericTSVReader(BaseTSVReader):
     test_sample_name_column = "testSample"
     ngs_library_name_column = "ngsLibrary"
 
-    def check_tsv_line(self, mapping, lineno):
-        """Cancer sample sheet--specific valiation"""
-        # Check for hyphen in patient or sample name
-        for key in ("bioEntity", "bioSample", "testSample", "ngsLibrary"):
-            if "-" in mapping[key]:
+    def column_checks(self):
+        """Generic sample sheet--specific valiation"""
+        return [
+            (key, self._check_no_hyphen(key))
+            for key in ("bioEntity", "bioSample", "testSample", "ngsLibrary")
+        ] + [
+            ("extractionType", self._check_extraction_type),
+            ("libraryType", self._check_library_type),
+        ]
+
+    @staticmethod
+    def _check_no_hyphen(key):
+        """Return check for hyphen in entity name field ``key``"""
+
+        def check(value, lineno):
+            if value and "-" in value:
                 raise GenericTSVSheetException(  # pragma: no cover
                     "Hyphen not allowed in {} column".format(key)
                 )
-        # Check "extractionType" field
-        if mapping["extractionType"] and (mapping["extractionType"] not in EXTRACTION_TYPES):
+            return value
+
+        return check
+
+    @staticmethod
+    def _check_extraction_type(value, lineno):
+        """Check "extractionType" field"""
+        if value and (value not in EXTRACTION_TYPES):
             raise GenericTSVSheetException(
                 "Invalid extraction type {}, must be in {{{}}}".format(
-                    mapping["extractionType"], ", ".join(EXTRACTION_TYPES)
+                    value, ", ".join(EXTRACTION_TYPES)
                 )
             )
-        # Check "libraryType" field
-        if mapping["libraryType"] and (mapping["libraryType"] not in LIBRARY_TYPES):
+        return value
+
+    @staticmethod
+    def _check_library_type(value, lineno):
+        """Check "libraryType" field"""
+        if value and (value not in LIBRARY_TYPES):
             raise GenericTSVSheetException(
-                "Invalid library type {}, must be in {{{}}}".format(
-                    mapping["libraryType"], ", ".join(LIBRARY_TYPES)
-                )
+                "Invalid library type {}, must be in {{{}}}".format(value, ", ".join(LIBRARY_TYPES))
             )
+        return value
 
     @classmethod
     def _check_consistency(cls, records, key):
@@ -134,31 +134,41 @@ class GermlineTSVReader(BaseTSVReader):
     bio_sample_name = "N1"
     optional_body_header_columns = ("seqPlatform", "bioSample", "testSample")
 
-    def check_tsv_line(self, mapping, lineno):
+    def column_checks(self):
         """Germline sample sheet--specific validation"""
-        # Check "libraryType" field
-        if mapping["libraryType"] and (mapping["libraryType"] not in LIBRARY_TYPES):
+        return [
+            ("libraryType", self._check_library_type),
+            ("sex", self._check_sex),
+            ("isAffected", self._check_is_affected),
+        ]
+
+    def _check_library_type(self, value, lineno):
+        """Check "libraryType" field"""
+        if value and (value not in LIBRARY_TYPES):
             raise GermlineTSVSheetException(
-                "Invalid library type {}, must be in {{{}}}".format(
-                    mapping["libraryType"], ", ".join(LIBRARY_TYPES)
-                )
+                "Invalid library type {}, must be in {{{}}}".format(value, ", ".join(LIBRARY_TYPES))
             )
-        # Check "sex" field
-        if mapping["sex"] not in SEX_VALUES.keys():
+        return value
+
+    def _check_sex(self, value, lineno):
+        """Check "sex" field and convert to canonical value"""
+        if value not in SEX_VALUES:
             raise GermlineTSVSheetException(  # pragma: no cover
                 ('Invalid "sex" value {} in line {} of data section of ' "{}").format(
-                    mapping["sex"], lineno + 2, self.fname
+                    value, lineno + 2, self.fname
                 )
             )
-        mapping["sex"] = SEX_VALUES[mapping["sex"]]
-        # Check "affected"
-        if mapping["isAffected"] not in AFFECTED_VALUES.keys():
+        return SEX_VALUES[value]
+
+    def _check_is_affected(self, value, lineno):
+        """Check "isAffected" field and convert to canonical value"""
+        if value not in AFFECTED_VALUES:
             raise GermlineTSVSheetException(  # pragma: no cover
                 ('Invalid "isAffected" value {} in line {} of data section of ' "{}").format(
-                    mapping["isAffected"], lineno + 2, self.fname
+                    value, lineno + 2, self.fname
                 )
             )
-        mapping["isAffected"] = AFFECTED_VALUES[mapping["isAffected"]]
+        return AFFECTED_VALUES[value]
 
     def postprocess_json_data(self, json_data):
         """Postprocess JSON data"""
@@ -46,6 +46,8 @@ class CrawlMixin:
     Also provides helpers for merging "sub_entries" dicts
     """
 
+    __slots__ = ()
+
     def crawl(self, name, sep="-"):
         """Crawl through sheet based on the path by secondary id"""
         if sep in name:
@@ -104,10 +106,68 @@ class Sheet(CrawlMixin):
         self.extra_infos = dict_type(extra_infos or [])
         #: List of ``BioEntity`` objects described in the sheet
         self.bio_entities = dict_type(bio_entities or [])
-        #: Create ``sub_entries`` shortcut for ``crawl()``
-        self.sub_entries = self.bio_entities
         #: Name generator used in the sheet
         self.name_generator = name_generator
+        # Lazily built ``SheetIndex``
+        self._index = None
+
+    @property
+    def sub_entries(self):
+        """Shortcut for ``crawl()``"""
+        return self.bio_entities
+
+    @property
+    def index(self):
+        """``SheetIndex`` for looking up entries, built on first access
+
+        Use ``add_bio_entity()`` for adding bio entities while keeping the
+        index current, call ``reset_index()`` after other modifications.
+        """
+        if self._index is None:
+            self._index = SheetIndex(self)
+        return self._index
+
+    def reset_index(self):
+        """Discard index, it is rebuilt on next access"""
+        self._index = None
+
+    def add_bio_entity(self, bio_entity):
+        """Add ``BioEntity`` to the sheet, updating the index if built"""
+        if bio_entity.secondary_id in self.bio_entities:
+            raise AmbiguousSecondaryIdException(
+                "Ambiguous secondary IDs: {}".format({bio_entity.secondary_id})
+            )
+        if self._index is not None:
+            self._index.add(bio_entity)
+        self.bio_entities[bio_entity.secondary_id] = bio_entity
+
+    def remove_bio_entity(self, secondary_id):
+        """Remove and return ``BioEntity`` with the given secondary ID, updating the index if
+        built
+
+        Raises ``KeyError`` if there is no such bio entity.
+        """
+        bio_entity = self.bio_entities.pop(secondary_id)
+        if self._index is not None:
+            self._index.remove(bio_entity)
+        return bio_entity
+
+    def replace_bio_entity(self, bio_entity):
+        """Replace the ``BioEntity`` with the same secondary ID by ``bio_entity``, keeping its
+        position and updating the index if built
+
+        Raises ``KeyError`` if there is no such bio entity.
+        """
+        old = self.bio_entities[bio_entity.secondary_id]
+        if self._index is not None:
+            self._index.remove(old)
+            try:
+                self._index.add(bio_entity)
+            except AmbiguousSecondaryIdException:
+                self._index.add(old)
+                raise
+        self.bio_entities[bio_entity.secondary_id] = bio_entity
+        return old
 
     def __repr__(self):
         return "Sheet({})".format(
@@ -136,8 +196,28 @@ class SheetEntry:
 
     Pulls up the common properties of primary key, secondary ID and additional
     properties dict
+
+    The entries use ``__slots__`` to keep the per-object overhead small.
+    Empty ``extra_ids`` and ``extra_infos`` are only created on first
+    access.
+
+    ``name`` and ``full_secondary_id`` are cached.  The caches are reset
+    when ``pk``, ``secondary_id``, ``name_generator``, or the parent entry
+    are assigned, for descendants as well where necessary.
     """
 
+    __slots__ = (
+        "_pk",
+        "disabled",
+        "_secondary_id",
+        "_extra_ids",
+        "_extra_infos",
+        "_dict_type",
+        "_name_generator",
+        "_name",
+        "_full_secondary_id",
+    )
+
     def __init__(
         self,
         pk,
@@ -148,29 +228,106 @@ class SheetEntry:
         dict_type=OrderedDict,
         name_generator=DEFAULT_NAME_GENERATOR,
     ):
-        #: Primary key of the bio entity, globally unique
-        self.pk = pk
+        # Primary key of the bio entity, globally unique
+        self._pk = pk
         #: Flag for explicit disabling of objects
         self.disabled = disabled
-        #: ``str`` with secondary id fragment of the bio entity, unique in the
-        #: sheet
-        self.secondary_id = secondary_id
-        #: Extra IDs
-        self.extra_ids = list(extra_ids or [])
-        #: Extra info, ``dict``-like object
-        self.extra_infos = dict_type(extra_infos or [])
-        #: Name generator to use
-        self.name_generator = name_generator
+        # ``str`` with secondary id fragment of the bio entity, unique in the
+        # sheet
+        self._secondary_id = secondary_id
+        # Extra IDs and extra info, ``None`` until accessed if empty
+        self._extra_ids = list(extra_ids) if extra_ids else None
+        self._extra_infos = dict_type(extra_infos) if extra_infos else None
+        self._dict_type = dict_type
+        # Name generator to use
+        self._name_generator = name_generator
+        # Cached name and full secondary ID, ``None`` if not computed yet
+        self._name = None
+        self._full_secondary_id = None
+
+    @property
+    def pk(self):
+        """Primary key of the bio entity, globally unique"""
+        return self._pk
+
+    @pk.setter
+    def pk(self, value):
+        self._pk = value
+        self._name = None
+
+    @property
+    def secondary_id(self):
+        """``str`` with secondary id fragment of the bio entity, unique in the sheet"""
+        return self._secondary_id
+
+    @secondary_id.setter
+    def secondary_id(self, value):
+        self._secondary_id = value
+        self._invalidate_names()
+
+    @property
+    def name_generator(self):
+        """Name generator to use"""
+        return self._name_generator
+
+    @name_generator.setter
+    def name_generator(self, value):
+        self._name_generator = value
+        self._name = None
+
+    @property
+    def extra_ids(self):
+        """Extra IDs, ``list``"""
+        if self._extra_ids is None:
+            self._extra_ids = []
+        return self._extra_ids
+
+    @extra_ids.setter
+    def extra_ids(self, value):
+        self._extra_ids = value
+
+    @property
+    def extra_infos(self):
+        """Extra info, ``dict``-like object"""
+        if self._extra_infos is None:
+            self._extra_infos = self._dict_type()
+        return self._extra_infos
+
+    @extra_infos.setter
+    def extra_infos(self, value):
+        self._extra_infos = value
 
     @property
     def full_secondary_id(self):
         """Return full path from BioEntity to this entry"""
+        if self._full_secondary_id is None:
+            self._full_secondary_id = self._build_full_secondary_id()
+        return self._full_secondary_id
+
+    def _build_full_secondary_id(self):
         raise NotImplementedError("Override me!")
 
     @property
     def name(self):
-        """Abstract function for returning name"""
-        return self.name_generator(self)
+        """Return name from the name generator"""
+        if self._name is None:
+            self._name = self._name_generator(self)
+        return self._name
+
+    def _invalidate_names(self):
+        """Reset cached names of this entry and its descendants"""
+        self._name = None
+        self._full_secondary_id = None
+        for entry in getattr(self, "sub_entries", {}).values():
+            entry._invalidate_names()
+
+    def _parent_changed(self, old_parent):
+        """Reset cached names before replacing ``old_parent``"""
+        if old_parent is None:  # no full secondary IDs below yet, e.g., on construction
+            self._name = None
+            self._full_secondary_id = None
+        else:
+            self._invalidate_names()
 
     @property
     def enabled(self):
@@ -181,6 +338,8 @@ class SheetEntry:
 class BioEntity(SheetEntry, CrawlMixin):
     """Represent one biological specimen"""
 
+    __slots__ = ("bio_samples",)
+
     def __init__(
         self,
         pk,
@@ -200,12 +359,14 @@ class BioEntity(SheetEntry, CrawlMixin):
         # Assign owner pointer in bio samples to self
         for bio_sample in self.bio_samples.values():
             bio_sample.bio_entity = self
-        #: Create ``sub_entries`` shortcut for ``crawl()``
-        self.sub_entries = self.bio_samples
 
     @property
-    def full_secondary_id(self):
-        return self.secondary_id
+    def sub_entries(self):
+        """Shortcut for ``crawl()``"""
+        return self.bio_samples
+
+    def _build_full_secondary_id(self):
+        return self._secondary_id
 
     def __repr__(self):
         return "BioEntity({})".format(
@@ -231,6 +392,8 @@ class BioEntity(SheetEntry, CrawlMixin):
 class BioSample(SheetEntry, CrawlMixin):
     """Represent one sample taken from a biological entity/specimen"""
 
+    __slots__ = ("_bio_entity", "test_samples")
+
     def __init__(
         self,
         pk,
@@ -246,19 +409,31 @@ class BioSample(SheetEntry, CrawlMixin):
         super().__init__(
             pk, disabled, secondary_id, extra_ids, extra_infos, dict_type, name_generator
         )
-        #: Containing BioEntity
-        self.bio_entity = bio_entity
+        # Containing BioEntity
+        self._bio_entity = bio_entity
         #: List of ``TestSample`` objects described for the ``BioSample``
         self.test_samples = dict_type(test_samples or [])
         # Assign owner pointer in test samples to self
         for test_sample in self.test_samples.values():
             test_sample.bio_sample = self
-        #: Create ``sub_entries`` shortcut for ``crawl()``
-        self.sub_entries = self.test_samples
 
     @property
-    def full_secondary_id(self):
-        return "-".join((self.bio_entity.full_secondary_id, self.secondary_id))
+    def sub_entries(self):
+        """Shortcut for ``crawl()``"""
+        return self.test_samples
+
+    def _build_full_secondary_id(self):
+        return "-".join((self._bio_entity.full_secondary_id, self._secondary_id))
+
+    @property
+    def bio_entity(self):
+        """Containing BioEntity"""
+        return self._bio_entity
+
+    @bio_entity.setter
+    def bio_entity(self, value):
+        self._parent_changed(self._bio_entity)
+        self._bio_entity = value
 
     def __repr__(self):
         return "BioSample({})".format(
@@ -284,6 +459,8 @@ class BioSample(SheetEntry, CrawlMixin):
 class TestSample(SheetEntry, CrawlMixin):
     """Represent a technical sample from biological sample, e.g., DNA or RNA"""
 
+    __slots__ = ("_bio_sample", "ngs_libraries")
+
     def __init__(
         self,
         pk,
@@ -299,19 +476,31 @@ class TestSample(SheetEntry, CrawlMixin):
         super().__init__(
             pk, disabled, secondary_id, extra_ids, extra_infos, dict_type, name_generator
         )
-        #: Containing BioSample
-        self.bio_sample = bio_sample
+        # Containing BioSample
+        self._bio_sample = bio_sample
         #: List of ``NGSLibrary`` objects described for the ``TestSample``
         self.ngs_libraries = dict_type(ngs_libraries or [])
         # Assign owner pointer in NGS libraries to self
         for ngs_library in self.ngs_libraries.values():
             ngs_library.test_sample = self
-        # ``sub_entries`` shortcut, check for duplicates
-        self.sub_entries = self._merge_sub_entries(self.ngs_libraries)
 
     @property
-    def full_secondary_id(self):
-        return "-".join((self.bio_sample.full_secondary_id, self.secondary_id))
+    def sub_entries(self):
+        """Shortcut for ``crawl()``"""
+        return self.ngs_libraries
+
+    def _build_full_secondary_id(self):
+        return "-".join((self._bio_sample.full_secondary_id, self._secondary_id))
+
+    @property
+    def bio_sample(self):
+        """Containing BioSample"""
+        return self._bio_sample
+
+    @bio_sample.setter
+    def bio_sample(self, value):
+        self._parent_changed(self._bio_sample)
+        self._bio_sample = value
 
     def __repr__(self):
         return "TestSample({})".format(
@@ -337,6 +526,8 @@ class TestSample(SheetEntry, CrawlMixin):
 class NGSLibrary(SheetEntry):
     """Represent one NGSLibrary generated from a test sample"""
 
+    __slots__ = ("_test_sample",)
+
     def __init__(
         self,
         pk,
@@ -351,12 +542,21 @@ class NGSLibrary(SheetEntry):
         super().__init__(
             pk, disabled, secondary_id, extra_ids, extra_infos, dict_type, name_generator
         )
-        #: Owning TestSample
-        self.test_sample = test_sample
+        # Owning TestSample
+        self._test_sample = test_sample
+
+    def _build_full_secondary_id(self):
+        return "-".join((self._test_sample.full_secondary_id, self._secondary_id))
 
     @property
-    def full_secondary_id(self):
-        return "-".join((self.test_sample.full_secondary_id, self.secondary_id))
+    def test_sample(self):
+        """Owning TestSample"""
+        return self._test_sample
+
+    @test_sample.setter
+    def test_sample(self, value):
+        self._parent_changed(self._test_sample)
+        self._test_sample = value
 
     def __repr__(self):
         return "NGSLibrary({})".format(
@@ -370,3 +570,113 @@ class NGSLibrary(SheetEntry):
 
     def __str__(self):
         return repr(self)
+
+
+class SheetIndex:
+    """Index of the entries in a ``Sheet`` by pk, full secondary ID, and name
+
+    Lookups return ``None`` if there is no such entry.
+    """
+
+    def __init__(self, sheet):
+        #: The indexed ``Sheet``
+        self.sheet = sheet
+        #: Mapping from pk to entry
+        self.by_pk = {}
+        #: Mapping from full secondary ID to entry
+        self.by_secondary_id = {}
+        #: Mapping from entry class to mapping from full secondary ID to entry
+        self.by_type = {
+            klass: OrderedDict() for klass in (BioEntity, BioSample, TestSample, NGSLibrary)
+        }
+        # Mapping from name to entry, only built if the name generator cannot
+        # be inverted
+        self._by_name = None
+        for bio_entity in sheet.bio_entities.values():
+            self.add(bio_entity)
+
+    @property
+    def bio_entities(self):
+        """``BioEntity`` objects by full secondary ID"""
+        return self.by_type[BioEntity]
+
+    @property
+    def bio_samples(self):
+        """``BioSample`` objects by full secondary ID"""
+        return self.by_type[BioSample]
+
+    @property
+    def test_samples(self):
+        """``TestSample`` objects by full secondary ID"""
+        return self.by_type[TestSample]
+
+    @property
+    def ngs_libraries(self):
+        """``NGSLibrary`` objects by full secondary ID"""
+        return self.by_type[NGSLibrary]
+
+    def add(self, bio_entity):
+        """Add ``BioEntity`` and all entries below to the index
+
+        Raises ``AmbiguousSecondaryIdException`` on duplicate full secondary
+        IDs, the index is unchanged in this case.
+        """
+        entries = list(self._iter_entries(bio_entity))
+        dupes = {
+            e.full_secondary_id for e in entries if e.full_secondary_id in self.by_secondary_id
+        }
+        if dupes:
+            raise AmbiguousSecondaryIdException("Ambiguous secondary IDs: {}".format(dupes))
+        for entry in entries:
+            self.by_pk[entry.pk] = entry
+            self.by_secondary_id[entry.full_secondary_id] = entry
+            self.by_type[type(entry)][entry.full_secondary_id] = entry
+        if self._by_name is not None:
+            self._by_name.update((entry.name, entry) for entry in entries)
+
+    def remove(self, bio_entity):
+        """Remove ``BioEntity`` and all entries below from the index"""
+        for entry in self._iter_entries(bio_entity):
+            if self.by_secondary_id.get(entry.full_secondary_id) is entry:
+                del self.by_secondary_id[entry.full_secondary_id]
+                del self.by_type[type(entry)][entry.full_secondary_id]
+            if self.by_pk.get(entry.pk) is entry:
+                del self.by_pk[entry.pk]
+            if self._by_name is not None and self._by_name.get(entry.name) is entry:
+                del self._by_name[entry.name]
+
+    def get_by_pk(self, pk):
+        """Return entry with the given ``pk``"""
+        return self.by_pk.get(pk)
+
+    def get_by_secondary_id(self, full_secondary_id):
+        """Return entry with the given full secondary ID"""
+        return self.by_secondary_id.get(full_secondary_id)
+
+    def get_by_name(self, name):
+        """Return entry with the given generated ``name``
+
+        Uses the inverse of the sheet's name generator if available and a
+        mapping of all names otherwise.
+        """
+        inverse = getattr(self.sheet.name_generator, "inverse", None)
+        if inverse:
+            try:
+                entry = self.by_secondary_id.get(inverse(name, "secondary_id"))
+            except ValueError:
+                return None
+            if entry is not None and entry.name == name:
+                return entry
+            return None
+        if self._by_name is None:
+            self._by_name = {entry.name: entry for entry in self.by_secondary_id.values()}
+        return self._by_name.get(name)
+
+    @staticmethod
+    def _iter_entries(bio_entity):
+        yield bio_entity
+        for bio_sample in bio_entity.bio_samples.values():
+            yield bio_sample
+            for test_sample in bio_sample.test_samples.values():
+                yield test_sample
+                yield from test_sample.ngs_libraries.values()
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Persistent on-disk cache for documents loaded through "$ref" URIs
+
+The entries are stored as pickled, already parsed documents.  Each entry
+carries a validator (e.g., file modification time and size or HTTP ETag)
+that is compared on lookup.  The total size of the cache directory is
+bounded, the least recently used entries are evicted first.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+__author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
+
+#: Default upper bound for the size of the cache directory in bytes
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+#: Version of the entry layout, bump on incompatible changes
+CACHE_FORMAT_VERSION = 2
+
+#: Suffix of cache entry files
+ENTRY_SUFFIX = ".pickle"
+
+
+class RefCacheEntry:
+    """Entry from the ``RefDiskCache``"""
+
+    def __init__(self, uri, validator, value):
+        #: URI of the cached document
+        self.uri = uri
+        #: Validator, e.g., ``(mtime_ns, size)`` or HTTP ETag
+        self.validator = validator
+        #: Parsed document
+        self.value = value
+
+
+class RefDiskCache:
+    """Size-bounded on-disk cache of parsed documents, keyed by URI and
+    ``namespace``
+
+    The ``namespace`` separates documents that are parsed differently from
+    the same URI, e.g., into different ``dict`` classes.  Thread-safe,
+    concurrent processes may share the cache directory as entries are
+    replaced atomically.
+    """
+
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE, namespace=""):
+        #: Path to the cache directory
+        self.path = path
+        #: Upper bound of the cache directory size in bytes
+        self.max_size = max_size
+        #: Namespace of the entries
+        self.namespace = namespace
+        #: Number of lookups with valid entry
+        self.hits = 0
+        #: Number of lookups without valid entry
+        self.misses = 0
+        #: Lock for the counters
+        self.lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def get(self, uri, validator=None):
+        """Return ``RefCacheEntry`` for ``uri`` or ``None``
+
+        If ``validator`` is not ``None`` then entries with a different
+        validator are ignored.  The hit/miss counters are not updated, use
+        ``count()`` for this.
+        """
+        entry_path = self._entry_path(uri)
+        try:
+            with open(entry_path, "rb") as inputf:
+                version, namespace, entry_uri, entry_validator, value = pickle.load(inputf)
+        except FileNotFoundError:
+            return None
+        except Exception:  # corrupt or incompatible entry
+            self._remove(entry_path)
+            return None
+        if version != CACHE_FORMAT_VERSION or (namespace, entry_uri) != (self.namespace, uri):
+            return None
+        elif validator is not None and entry_validator != validator:
+            return None
+        try:
+            os.utime(entry_path)  # mark as recently used
+        except OSError:  # pragma: no cover
+            pass
+        return RefCacheEntry(uri, entry_validator, value)
+
+    def put(self, uri, validator, value):
+        """Store ``value`` for ``uri`` with the given ``validator``"""
+        payload = pickle.dumps(
+            (CACHE_FORMAT_VERSION, self.namespace, uri, validator, value),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        if len(payload) > self.max_size:
+            return  # would be evicted right away
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as outputf:
+                outputf.write(payload)
+            os.replace(tmp_path, self._entry_path(uri))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self.evict()
+
+    def count(self, hit):
+        """Increment hit or miss counter"""
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def evict(self):
+        """Remove least recently used entries until below ``max_size``"""
+        entries = []
+        total = 0
+        with os.scandir(self.path) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(ENTRY_SUFFIX):
+                    try:
+                        stat = dir_entry.stat()
+                    except FileNotFoundError:  # pragma: no cover
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, dir_entry.path))
+                    total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Remove all entries"""
+        with os.scandir(self.path) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(ENTRY_SUFFIX):
+                    self._remove(dir_entry.path)
+
+    def _entry_path(self, uri):
+        digest = hashlib.sha256("{}\n{}".format(self.namespace, uri).encode("utf-8")).hexdigest()
+        return os.path.join(self.path, digest + ENTRY_SUFFIX)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 """Code for resolving references in JSON code"""
 
-from collections.abc import MutableMapping, MutableSequence
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping, MutableSequence, Sequence
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import json
 import os
 import sys
-from urllib.parse import urlparse
+import threading
+from urllib.parse import unquote, urlparse
 
-import jsonpath_rw
 import requests
 from requests.exceptions import HTTPError
 import requests_file
@@ -18,7 +22,7 @@ try:
 except ImportError:
     YAML_AVAILABLE = False
 
-from . import requests_resource
+from . import ref_cache, requests_resource
 
 __author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
 
@@ -27,20 +31,112 @@ class RefResolutionException(Exception):
     """Raised on problems with resolving JSON pointers"""
 
 
+class JsonPointerException(LookupError):
+    """Raised on problems with parsing or evaluating JSON pointers"""
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_json_pointer(pointer):
+    """Parse RFC 6901 JSON ``pointer`` into a tuple of reference tokens
+
+    The result is memoized, the ``~1`` and ``~0`` escapes are replaced.
+    """
+    if not pointer:
+        return ()
+    elif not pointer.startswith("/"):
+        raise JsonPointerException("Invalid JSON pointer {}".format(repr(pointer)))
+    return tuple(token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/"))
+
+
+def resolve_json_pointer(doc, pointer):
+    """Return the value at the RFC 6901 JSON ``pointer`` in ``doc``
+
+    :raises: JsonPointerException if ``pointer`` does not point to a value
+    """
+    for token in parse_json_pointer(pointer):
+        if isinstance(doc, Mapping):
+            if token not in doc:
+                raise JsonPointerException("Could not find key {}".format(repr(token)))
+            doc = doc[token]
+        elif isinstance(doc, Sequence) and not isinstance(doc, str):
+            if not token.isdigit() or (token != "0" and token.startswith("0")):
+                raise JsonPointerException("Invalid array index {}".format(repr(token)))
+            elif int(token) >= len(doc):
+                raise JsonPointerException("Array index {} out of range".format(token))
+            doc = doc[int(token)]
+        else:
+            raise JsonPointerException("Cannot descend into {}".format(repr(doc)))
+    return doc
+
+
+#: Default number of threads for prefetching "$ref" documents
+DEFAULT_PREFETCH_WORKERS = 8
+
+#: File name extensions of YAML documents, everything else is tried as JSON first
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+
 class RefResolver:
     """Helper class for resolving JSON pointers in "$ref" properties
 
     The resolver will perform on inline updates but rather create new
     dicts and lists with copies.
+
+    With ``structural_sharing=True``, dicts and lists that contain no
+    ``"$ref"`` anywhere below them are not copied but used by reference.
+    The result then shares these containers (with their original types
+    rather than ``dict_class``) with the input document and the loaded
+    documents, and must be treated as read-only.
+
+    Before resolution, all documents reachable through "$ref" URIs are
+    fetched concurrently by up to ``prefetch_workers`` threads.  Errors
+    during prefetching are ignored, they are raised by the resolution
+    itself.  Use ``prefetch_workers=0`` for sequential loading.
     """
 
-    def __init__(self, lookup_paths=None, dict_class=dict, verbose=False):
+    def __init__(
+        self,
+        lookup_paths=None,
+        dict_class=dict,
+        verbose=False,
+        cache_dir=None,
+        cache_max_size=ref_cache.DEFAULT_MAX_SIZE,
+        structural_sharing=False,
+        prefetch_workers=DEFAULT_PREFETCH_WORKERS,
+    ):
         self.cache = {}
         self.dict_class = dict_class
         self.lookup_paths = list(lookup_paths or [])
         #: whether or not to resolve relative paths using cwd
         self.rel_cwd_paths = True
         self.verbose = verbose  # TODO: use logging instead
+        #: optional persistent cache for ``file://`` and ``http(s)://`` documents
+        #: the documents are cached per ``dict_class`` as they are stored already parsed
+        self.disk_cache = (
+            ref_cache.RefDiskCache(
+                cache_dir,
+                cache_max_size,
+                "{}.{}".format(dict_class.__module__, dict_class.__qualname__),
+            )
+            if cache_dir
+            else None
+        )
+        #: whether to reuse containers without "$ref" below them instead of copying
+        self.structural_sharing = structural_sharing
+        #: maximal number of threads for prefetching documents, ``0`` to disable
+        self.prefetch_workers = prefetch_workers
+        # Memo for ``_is_ref_free()``, maps ``id(obj)`` to ``(obj, flag)``
+        self._ref_free_memo = {}
+
+    @property
+    def disk_cache_hits(self):
+        """Number of documents taken from the on-disk cache"""
+        return self.disk_cache.hits if self.disk_cache else 0
+
+    @property
+    def disk_cache_misses(self):
+        """Number of cacheable documents not found in the on-disk cache"""
+        return self.disk_cache.misses if self.disk_cache else 0
 
     def resolve(self, doc_uri, obj):
         """Entry point for resolving JSON pointers
@@ -51,13 +147,96 @@ class RefResolver:
 
         raises RefResolutionError on problems with the resolution
         """
-        self.cache = {doc_uri: obj}
+        # The documents by URI without fragment, "" is the current document
+        self.cache = {"": obj}
+        self._ref_free_memo = {}
+        if self.prefetch_workers:
+            self._prefetch(obj)
+        key = None
+        try:
+            with self._create_session() as session:
+                return self._resolve(type(obj)(), obj, session, key)
+        finally:
+            self._ref_free_memo = {}
+
+    @staticmethod
+    def _create_session():
         session = requests.Session()
         session.mount("file://", requests_file.FileAdapter())
         session.mount("resource://", requests_resource.ResourceAdapter())
-        key = None
-        with session:
-            return self._resolve(type(obj)(), obj, session, key)
+        return session
+
+    def _prefetch(self, obj):
+        """Concurrently load all documents reachable by "$ref" from ``obj`` into the cache
+
+        The documents are loaded in waves, one wave per level of inclusion.
+        """
+        local = threading.local()
+        sessions = []
+
+        def fetch(parsed_uri):
+            if not hasattr(local, "session"):
+                local.session = self._create_session()
+                sessions.append(local.session)
+            try:
+                return self._load_for_cache(parsed_uri, local.session)
+            except Exception:
+                return None  # raised again on resolution
+
+        seen = set()
+        objs = [obj]
+        with ThreadPoolExecutor(max_workers=self.prefetch_workers) as executor:
+            while objs:
+                parsed_uris = self._collect_ref_uris(objs, seen)
+                to_fetch = OrderedDict()
+                for doc_key, parsed_uri in parsed_uris:
+                    if doc_key not in self.cache:
+                        to_fetch.setdefault(doc_key, parsed_uri)
+                for doc_key, doc in zip(to_fetch, executor.map(fetch, to_fetch.values())):
+                    if doc is not None:
+                        self.cache[doc_key] = doc
+                objs = []
+                for doc_key, parsed_uri in parsed_uris:
+                    try:
+                        objs.append(
+                            resolve_json_pointer(self.cache[doc_key], unquote(parsed_uri.fragment))
+                        )
+                    except (KeyError, JsonPointerException):
+                        pass  # raised again on resolution
+        for session in sessions:
+            session.close()
+
+    def _collect_ref_uris(self, objs, seen):
+        """Return list of ``(doc_key, parsed_uri)`` for "$ref" URIs in ``objs`` not in ``seen``"""
+        result = []
+        for obj in objs:
+            for ref_uri in self._iter_ref_uris(obj):
+                if ref_uri not in seen:
+                    seen.add(ref_uri)
+                    try:
+                        parsed_uri = self._parse_ref_uri(ref_uri)
+                    except RefResolutionException:
+                        continue  # raised again on resolution
+                    result.append((self._doc_key(parsed_uri), parsed_uri))
+        return result
+
+    @staticmethod
+    def _iter_ref_uris(obj):
+        """Yield all "$ref" values in ``obj``, including nested ones"""
+        stack = [obj]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, Mapping):
+                if isinstance(obj.get("$ref"), str):
+                    yield obj["$ref"]
+                stack.extend(obj.values())
+            elif isinstance(obj, list):
+                stack.extend(obj)
+
+    @staticmethod
+    def _doc_key(parsed_uri):
+        """Return key in ``self.cache`` for parsed "$ref" URI"""
+        return parsed_uri._replace(fragment="").geturl()
 
     def _resolve(self, base_obj, obj, session, key):
         if isinstance(base_obj, (int, bool, float, str)):  # JSON atomic
@@ -65,7 +244,7 @@ class RefResolver:
         elif isinstance(base_obj, (dict, MutableMapping)):  # JSON object
             return self._resolve_dict_entry(base_obj, obj, session)
         elif isinstance(base_obj, (list, MutableSequence)):  # JSON list
-            return [self._resolve(elem, type(elem)(), session, key) for elem in base_obj]
+            return [self._resolve_new(elem, session, key) for elem in base_obj]
         else:
             raise RefResolutionException(
                 f"Can only resolve in dict and list container objects and "
@@ -99,25 +278,47 @@ class RefResolver:
                     if k in result:
                         result[k] = self._resolve(v, result[k], session, k)
                     else:
-                        result[k] = self._resolve(v, type(v)(), session, k)
+                        result[k] = self._resolve_new(v, session, k)
         return result
 
+    def _resolve_new(self, obj, session, key):
+        """Resolve ``obj`` that is not merged with an existing value"""
+        if self.structural_sharing and self._is_ref_free(obj):
+            return obj
+        else:
+            return self._resolve(obj, type(obj)(), session, key)
+
+    def _is_ref_free(self, obj):
+        """Return whether ``obj`` is a JSON value without any "$ref" in it"""
+        if isinstance(obj, (int, bool, float, str)):
+            return True
+        elif not isinstance(obj, (dict, MutableMapping, list, MutableSequence)):
+            return False  # let ``_resolve()`` report the problem
+        memo = self._ref_free_memo.get(id(obj))
+        if memo is not None:
+            return memo[1]
+        if isinstance(obj, (dict, MutableMapping)):
+            flag = "$ref" not in obj and all(map(self._is_ref_free, obj.values()))
+        else:
+            flag = all(map(self._is_ref_free, obj))
+        self._ref_free_memo[id(obj)] = (obj, flag)  # keep obj alive while id() is used
+        return flag
+
     def _load_ref(self, ref_uri, session):
         """Resolve "$ref" URI ``uri``"""
         if self.verbose:
             print("Resolving $ref URI {}".format(ref_uri), file=sys.stderr)
         parsed_ref_uri = self._parse_ref_uri(ref_uri)
-        ref_file = parsed_ref_uri.netloc + parsed_ref_uri.path
-        if not ref_file:  # must be relative to current doc
-            pass  # is already in cache
-        elif ref_file not in self.cache:
-            self.cache[ref_uri] = self._load_for_cache(parsed_ref_uri, session)
-        ref_json = self.cache[ref_uri]
-        expr = jsonpath_rw.parse("$" + ".".join(parsed_ref_uri.fragment.split("/")))
-        for match in expr.find(ref_json):
-            return match.value  # return first match only
-        # If we reach here, resolution failed
-        raise RefResolutionException('Could not resolve reference URI "{}"'.format(ref_uri))
+        doc_key = self._doc_key(parsed_ref_uri)  # "" if relative to current doc
+        if doc_key not in self.cache:
+            self.cache[doc_key] = self._load_for_cache(parsed_ref_uri, session)
+        ref_json = self.cache[doc_key]
+        try:
+            return resolve_json_pointer(ref_json, unquote(parsed_ref_uri.fragment))
+        except JsonPointerException as e:
+            raise RefResolutionException(
+                'Could not resolve reference URI "{}"'.format(ref_uri)
+            ) from e
 
     def _parse_ref_uri(self, ref_uri):
         parsed_ref_uri = urlparse(ref_uri)
@@ -141,19 +342,76 @@ class RefResolver:
         remote_uri = "{}://{}/{}".format(parsed_uri.scheme, parsed_uri.netloc, parsed_uri.path)
         if self.verbose:
             print("Loading URI {}".format(remote_uri), file=sys.stderr)
-        response = session.get(remote_uri)
+        if self.disk_cache and parsed_uri.scheme == "file":
+            return self._load_file_with_disk_cache(parsed_uri, remote_uri, session)
+        elif self.disk_cache and parsed_uri.scheme in ("http", "https"):
+            return self._load_http_with_disk_cache(parsed_uri, remote_uri, session)
+        else:
+            return self._load_json(self._get(parsed_uri, remote_uri, session), parsed_uri)
+
+    def _get(self, parsed_uri, remote_uri, session, headers=None):
+        """Perform GET request, return response"""
+        response = session.get(remote_uri, headers=headers)
         try:
             response.raise_for_status()
         except HTTPError as e:
             raise RefResolutionException(
                 "Could not load file {}".format(parsed_uri.geturl())
             ) from e
-        remote_json = self._load_json(response)
+        return response
+
+    def _load_file_with_disk_cache(self, parsed_uri, remote_uri, session):
+        """Load local file, cached by modification time and size"""
+        try:
+            stat = os.stat(unquote(parsed_uri.netloc + parsed_uri.path))
+        except OSError:  # not cacheable, let the adapter handle it
+            return self._load_json(self._get(parsed_uri, remote_uri, session), parsed_uri)
+        validator = (stat.st_mtime_ns, stat.st_size)
+        entry = self.disk_cache.get(remote_uri, validator)
+        self.disk_cache.count(entry is not None)
+        if entry:
+            return entry.value
+        remote_json = self._load_json(self._get(parsed_uri, remote_uri, session), parsed_uri)
+        self.disk_cache.put(remote_uri, validator, remote_json)
+        return remote_json
+
+    def _load_http_with_disk_cache(self, parsed_uri, remote_uri, session):
+        """Load remote document, revalidated by ETag"""
+        entry = self.disk_cache.get(remote_uri)
+        headers = {"If-None-Match": entry.validator} if entry else None
+        response = self._get(parsed_uri, remote_uri, session, headers)
+        self.disk_cache.count(bool(entry and response.status_code == 304))
+        if entry and response.status_code == 304:
+            return entry.value
+        remote_json = self._load_json(response, parsed_uri)
+        if response.headers.get("ETag"):
+            self.disk_cache.put(remote_uri, response.headers["ETag"], remote_json)
         return remote_json
 
-    def _load_json(self, response):
-        if YAML_AVAILABLE:
-            yaml = ruamel_yaml.YAML()
-            return yaml.load(response.text)
+    def _load_json(self, response, parsed_uri):
+        """Parse document from ``response``
+
+        The stdlib JSON parser is used first unless the URI or content type
+        indicates YAML, YAML is the fallback if the document is not valid
+        JSON.  Objects are returned as ``self.dict_class``.
+        """
+        content_type = response.headers.get("Content-Type", "")
+        is_yaml = parsed_uri.path.lower().endswith(YAML_EXTENSIONS) or "yaml" in content_type
+        if not is_yaml or not YAML_AVAILABLE:
+            try:
+                return json.loads(response.content, object_pairs_hook=self.dict_class)
+            except ValueError:
+                if not YAML_AVAILABLE:
+                    raise
+        # the pure loader implements YAML 1.2, as the round-trip loader used for sheets does
+        yaml = ruamel_yaml.YAML(typ="safe", pure=True)
+        return self._to_dict_class(yaml.load(response.text))
+
+    def _to_dict_class(self, obj):
+        """Convert mappings and sequences from YAML loader to ``self.dict_class`` and lists"""
+        if isinstance(obj, Mapping):
+            return self.dict_class((k, self._to_dict_class(v)) for k, v in obj.items())
+        elif isinstance(obj, list):
+            return [self._to_dict_class(v) for v in obj]
         else:
-            return response.json(object_pairs_hook=self.dict_class)
+            return obj
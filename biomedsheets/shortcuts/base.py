@@ -27,6 +27,8 @@ Also note that none of the shortcut objects will reflect changes in the
 underlying schema data structure.
 """
 
+from collections.abc import ItemsView, Mapping, ValuesView
+
 from .. import models
 
 __author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
@@ -91,6 +93,82 @@ class ShortcutSampleSheet:
         return self.wrapped.extra_infos
 
 
+class _LazyShortcutValuesView(ValuesView):
+    """Values view of ``LazyShortcutMapping`` that avoids one lookup per key"""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._mapping._iter_wrapped()
+
+
+class _LazyShortcutItemsView(ItemsView):
+    """Items view of ``LazyShortcutMapping`` that avoids one lookup per key"""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return zip(self._mapping.wrapped, self._mapping._iter_wrapped())
+
+
+class LazyShortcutMapping(Mapping):
+    """Read-only mapping that creates shortcut wrappers on first access
+
+    Keys and their order are taken from the wrapped mapping, the wrapper for a
+    value is created as ``wrapper_class(parent, value)`` and cached afterwards.
+    """
+
+    __slots__ = ("wrapped", "parent", "wrapper_class", "_cache")
+
+    def __init__(self, wrapped, parent, wrapper_class):
+        #: The wrapped mapping with the raw ``models`` objects
+        self.wrapped = wrapped
+        #: The parent shortcut object, passed to ``wrapper_class``
+        self.parent = parent
+        #: Shortcut class to wrap the values of ``wrapped`` with
+        self.wrapper_class = wrapper_class
+        #: Cache of the wrappers created so far
+        self._cache = {}
+
+    def __getitem__(self, key):
+        result = self._cache.get(key)
+        if result is None:
+            result = self._cache[key] = self.wrapper_class(self.parent, self.wrapped[key])
+        return result
+
+    def _iter_wrapped(self):
+        """Yield the wrappers for all values of ``self.wrapped`` in order"""
+        cache = self._cache
+        for key, value in self.wrapped.items():
+            result = cache.get(key)
+            if result is None:
+                result = cache[key] = self.wrapper_class(self.parent, value)
+            yield result
+
+    def __contains__(self, key):
+        return key in self.wrapped
+
+    def __iter__(self):
+        return iter(self.wrapped)
+
+    def __len__(self):
+        return len(self.wrapped)
+
+    def values(self):
+        return _LazyShortcutValuesView(self)
+
+    def items(self):
+        return _LazyShortcutItemsView(self)
+
+    @property
+    def built_count(self):
+        """Number of wrappers created so far"""
+        return len(self._cache)
+
+    def __repr__(self):
+        return "LazyShortcutMapping({})".format(list(self.wrapped))
+
+
 class ShortcutMixin:
     """Mixin with helper functions"""
 
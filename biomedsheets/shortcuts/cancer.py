@@ -47,6 +47,24 @@ class CancerCaseSheetOptions:
         return str(self)
 
 
+def _pair_mapping_property(index_attr, doc):
+    """Return property for a mapping of sample pairs that is taken from attribute
+    ``index_attr`` of the ``CancerCaseSheetIndex`` unless assigned
+    """
+    private_name = "_all_sample_pairs_by_" + index_attr[len("pairs_by_") :]
+
+    def getter(self):
+        value = getattr(self, private_name)
+        if value is None:
+            return getattr(self.index, index_attr)
+        return value
+
+    def setter(self, value):
+        setattr(self, private_name, value)
+
+    return property(getter, setter, doc=doc + ", taken from the index unless assigned")
+
+
 class CancerCaseSheet(ShortcutSampleSheet):
     """Shortcut for "matched tumor/normal" view on bio-medical sample sheets
 
@@ -67,24 +85,48 @@ class CancerCaseSheet(ShortcutSampleSheet):
         self.primary_sample_pairs = list(self._iter_sample_pairs(True))
         #: List of all matched tumor/normal sample pairs in the sample sheet
         self.all_sample_pairs = list(self._iter_sample_pairs(False))
-        #: Mapping of all sample pairs by name of primary DNA test sample
-        self.all_sample_pairs_by_tumor_dna_test_sample = OrderedDict(
-            (pair.tumor_sample.dna_test_sample.name, pair)
-            for pair in self.all_sample_pairs
-            if pair.tumor_sample and pair.tumor_sample.dna_test_sample
-        )
-        #: Mapping of all sample pairs by name of primary DNA library name
-        self.all_sample_pairs_by_tumor_dna_ngs_library = OrderedDict(
-            (pair.tumor_sample.dna_ngs_library.name, pair)
-            for pair in self.all_sample_pairs
-            if pair.tumor_sample.dna_ngs_library
-        )
-        #: Mapping of all sample pairs by name of primary RNA library name
-        self.all_sample_pairs_by_tumor_rna_ngs_library = OrderedDict(
-            (pair.tumor_sample.rna_ngs_library.name, pair)
-            for pair in self.all_sample_pairs
-            if pair.tumor_sample.rna_ngs_library
-        )
+        # ``CancerCaseSheetIndex``, built on first access
+        self._index = None
+        # Assigned mappings of sample pairs, taken from the index if ``None``
+        self._all_sample_pairs_by_tumor_dna_test_sample = None
+        self._all_sample_pairs_by_tumor_dna_ngs_library = None
+        self._all_sample_pairs_by_tumor_rna_ngs_library = None
+
+    @property
+    def index(self):
+        """``CancerCaseSheetIndex`` for looking up donors, samples, and pairs by name, built
+        on first access
+
+        Call ``reset_index()`` after modifying the donors or pairs.
+        """
+        if self._index is None:
+            self._index = CancerCaseSheetIndex(self)
+        return self._index
+
+    def reset_index(self):
+        """Discard index, it is rebuilt on next access"""
+        self._index = None
+
+    def lookup(self, name):
+        """Return ``CancerIndexEntry`` for the donor, bio sample, test sample, or NGS library
+        with the given ``name`` or ``None`` if there is no such entry
+        """
+        return self.index.by_name.get(name)
+
+    all_sample_pairs_by_tumor_dna_test_sample = _pair_mapping_property(
+        "pairs_by_tumor_dna_test_sample",
+        "Mapping of all sample pairs by name of primary DNA test sample",
+    )
+
+    all_sample_pairs_by_tumor_dna_ngs_library = _pair_mapping_property(
+        "pairs_by_tumor_dna_ngs_library",
+        "Mapping of all sample pairs by name of primary DNA library",
+    )
+
+    all_sample_pairs_by_tumor_rna_ngs_library = _pair_mapping_property(
+        "pairs_by_tumor_rna_ngs_library",
+        "Mapping of all sample pairs by name of primary RNA library",
+    )
 
     def _iter_donors(self):
         """Return iterator over the donors in the study"""
@@ -106,6 +148,108 @@ class CancerCaseSheet(ShortcutSampleSheet):
                 yield from donor.all_pairs
 
 
+class CancerIndexEntry:
+    """Result of looking up a name in a ``CancerCaseSheet``"""
+
+    def __init__(self, donor, bio_sample, pairs):
+        #: The ``CancerDonor``
+        self.donor = donor
+        #: The ``CancerBioSample``, ``None`` when looking up a donor
+        self.bio_sample = bio_sample
+        #: List of the ``CancerMatchedSamplePair`` objects with ``bio_sample`` as tumor or
+        #: normal sample, all pairs of the donor when looking up a donor
+        self.pairs = pairs
+
+    @property
+    def pair(self):
+        """The first of ``self.pairs``, i.e., the pair of a tumor sample or the primary
+        pair of a normal sample or donor; ``None`` if there is no pair
+        """
+        return self.pairs[0] if self.pairs else None
+
+    def __repr__(self):
+        return "CancerIndexEntry({})".format(
+            ", ".join(map(str, [self.donor, self.bio_sample, self.pairs]))
+        )
+
+    def __str__(self):
+        return repr(self)
+
+
+class CancerCaseSheetIndex:
+    """Index of a ``CancerCaseSheet`` by names of donors, bio samples, test samples, and
+    NGS libraries
+
+    The name index and the pair mappings are built independently on first access.
+    """
+
+    def __init__(self, sheet):
+        #: The indexed ``CancerCaseSheet``
+        self.sheet = sheet
+        self._by_name = None
+        self._pairs_by_tumor = None
+
+    @property
+    def by_name(self):
+        """Mapping from name to ``CancerIndexEntry``"""
+        if self._by_name is None:
+            self._by_name = self._build_by_name()
+        return self._by_name
+
+    @property
+    def pairs_by_tumor_dna_test_sample(self):
+        """Mapping of all sample pairs by name of primary tumor DNA test sample"""
+        return self._get_pairs_by_tumor()[0]
+
+    @property
+    def pairs_by_tumor_dna_ngs_library(self):
+        """Mapping of all sample pairs by name of primary tumor DNA library name"""
+        return self._get_pairs_by_tumor()[1]
+
+    @property
+    def pairs_by_tumor_rna_ngs_library(self):
+        """Mapping of all sample pairs by name of primary tumor RNA library name"""
+        return self._get_pairs_by_tumor()[2]
+
+    def _get_pairs_by_tumor(self):
+        if self._pairs_by_tumor is None:
+            self._pairs_by_tumor = self._build_pairs_by_tumor()
+        return self._pairs_by_tumor
+
+    def _build_pairs_by_tumor(self):
+        by_dna_test_sample = OrderedDict()
+        by_dna_ngs_library = OrderedDict()
+        by_rna_ngs_library = OrderedDict()
+        for pair in self.sheet.all_sample_pairs:
+            tumor_sample = pair.tumor_sample
+            if tumor_sample.dna_test_sample:
+                by_dna_test_sample[tumor_sample.dna_test_sample.name] = pair
+            if tumor_sample.dna_ngs_library:
+                by_dna_ngs_library[tumor_sample.dna_ngs_library.name] = pair
+            if tumor_sample.rna_ngs_library:
+                by_rna_ngs_library[tumor_sample.rna_ngs_library.name] = pair
+        return by_dna_test_sample, by_dna_ngs_library, by_rna_ngs_library
+
+    def _build_by_name(self):
+        pairs_by_bio_sample = {}
+        for pair in self.sheet.all_sample_pairs:
+            for bio_sample in (pair.tumor_sample, pair.normal_sample):
+                pairs_by_bio_sample.setdefault(id(bio_sample), []).append(pair)
+        result = {}
+        for donor in self.sheet.donors:
+            result[donor.name] = CancerIndexEntry(donor, None, donor.all_pairs)
+            for bio_sample in donor.bio_samples.values():
+                entry = CancerIndexEntry(
+                    donor, bio_sample, pairs_by_bio_sample.get(id(bio_sample), [])
+                )
+                result[bio_sample.name] = entry
+                for test_sample in bio_sample.bio_sample.test_samples.values():
+                    result[test_sample.name] = entry
+                    for ngs_library in test_sample.ngs_libraries.values():
+                        result[ngs_library.name] = entry
+        return result
+
+
 class CancerMatchedSamplePair:
     """Represents a matched tumor/normal sample pair"""
 
@@ -140,10 +284,8 @@ class CancerBioSample(GenericBioSample):
         super().__init__(shortcut_bio_entity, bio_sample)
         #: The ``CancerDonor`` from the sample sheet
         self.donor = shortcut_bio_entity
-        #: The primary DNA test sample
-        self.dna_test_sample = self._get_primary_dna_test_sample()
-        #: The primary RNA test sample, if any
-        self.rna_test_sample = self._get_primary_rna_test_sample()
+        #: The primary DNA and RNA test samples, if any
+        self.dna_test_sample, self.rna_test_sample = self._get_primary_test_samples()
         #: The primary DNA NGS library for this sample
         self.dna_ngs_library = self._get_primary_dna_ngs_library()
         #: The primary RNA NGS library for this sample, if any
@@ -154,25 +296,29 @@ class CancerBioSample(GenericBioSample):
         """Whether or not the bio sample is cancerous"""
         return self.extra_infos[KEY_IS_TUMOR]
 
-    def _get_primary_dna_test_sample(self):
-        """Spider through ``self.bio_sample`` and return primary DNA test
-        sample
-        """
-        sample = next(self._iter_all_test_samples(EXTRACTION_TYPE_DNA, True), None)
-        if sample:
-            return TestSampleShortcut(self, sample, "ngs_library")
-        else:
-            return None
+    def _get_primary_test_samples(self):
+        """Spider through ``self.bio_sample`` and return pair of primary DNA
+        and RNA test sample, ``None`` for missing ones
 
-    def _get_primary_rna_test_sample(self):
-        """Spider through ``self.bio_sample`` and return primary RNA test
-        sample, if any; ``None`` otherwise
+        The test samples are classified by extraction type in a single pass
+        that stops once both primary test samples have been found.
         """
-        sample = next(self._iter_all_test_samples(EXTRACTION_TYPE_RNA, True), None)
-        if sample:
-            return TestSampleShortcut(self, sample, "ngs_library")
-        else:
-            return None
+        primary = {EXTRACTION_TYPE_DNA: None, EXTRACTION_TYPE_RNA: None}
+        missing = len(primary)
+        for test_sample in self.bio_sample.test_samples.values():
+            if KEY_EXTRACTION_TYPE not in test_sample.extra_infos:
+                raise MissingDataEntity(  # pragma: no cover
+                    'Could not find "{}" flag in TestSample {}'.format(
+                        KEY_EXTRACTION_TYPE, test_sample
+                    )
+                )
+            ext_type = test_sample.extra_infos[KEY_EXTRACTION_TYPE]
+            if ext_type in primary and primary[ext_type] is None:
+                primary[ext_type] = TestSampleShortcut(self, test_sample, "ngs_library")
+                missing -= 1
+                if not missing:
+                    break
+        return primary[EXTRACTION_TYPE_DNA], primary[EXTRACTION_TYPE_RNA]
 
     def _get_primary_dna_ngs_library(self):
         """Get primary DNA NGS library from self.dna_test_sample"""
@@ -194,30 +340,6 @@ class CancerBioSample(GenericBioSample):
         else:
             return None
 
-    def _iter_all_test_samples(self, ext_type, allow_none):
-        """Yield all test samples with the given extraction type
-
-        Require yielding of at least one unless ``allow_none``
-        """
-        yielded_any = False
-        for test_sample in self.bio_sample.test_samples.values():
-            if KEY_EXTRACTION_TYPE not in test_sample.extra_infos:
-                raise MissingDataEntity(  # pragma: no cover
-                    'Could not find "{}" flag in TestSample {}'.format(
-                        KEY_EXTRACTION_TYPE, test_sample
-                    )
-                )
-            elif test_sample.extra_infos[KEY_EXTRACTION_TYPE] == ext_type:
-                yielded_any = True
-                yield test_sample
-        if not yielded_any and not allow_none:
-            raise MissingDataEntity(  # pragma: no cover
-                (
-                    "Could not find a TestSample with {} == {} for "
-                    "BioSample {}".format(KEY_EXTRACTION_TYPE, ext_type, self.bio_sample)
-                )
-            )
-
     def __repr__(self):
         return "CancerBioSample({})".format(", ".join(map(str, [self.bio_entity, self.bio_sample])))
 
@@ -233,73 +355,54 @@ class CancerDonor(GenericBioEntity):
 
     def __init__(self, shortcut_sheet, bio_entity):
         super().__init__(shortcut_sheet, bio_entity)
-        #: The primary ``CancerMatchedSamplePair``
-        self.primary_pair = self._get_primary_pair()
         #: All tumor/normal pairs
-        self.all_pairs = list(self._iter_all_pairs())
-
-    def _get_primary_pair(self):
-        """Return primary ``CancerMatchedSamplePair``"""
-        try:
-            return next(self._iter_all_pairs())
-        except StopIteration:
-            return None
-
-    def _iter_all_pairs(self):
-        """Iterate all tumor/normal pair"""
-        normal_bio_sample = self._get_primary_normal_bio_sample()
-        if normal_bio_sample:
-            for tumor_bio_sample in self._iter_tumor_bio_samples():
-                yield CancerMatchedSamplePair(self, tumor_bio_sample, normal_bio_sample)
-
-    def _get_primary_normal_bio_sample(self):
-        """Return primary normal ``BioSample``
-
-        Raises ``MissingDataEntity`` in the case of problems
-        """
-        for bio_sample in self.bio_samples.values():
-            if KEY_IS_TUMOR not in bio_sample.extra_infos:
-                raise MissingDataEntity(  # pragma: no cover
-                    'Could not find "{}" flag in BioSample {}'.format(KEY_IS_TUMOR, bio_sample)
-                )
-            elif not bio_sample.extra_infos[KEY_IS_TUMOR]:
-                return bio_sample
-        # Having no normal sample is an error by default but this behaviour
-        # can be switched off.
-        tpl = "Could not find primary normal sample for BioEntity {}"
-        msg = tpl.format(self.bio_entity)
-        if not self.sheet.options.allow_missing_normal:  # pragma: no cover
-            raise MissingDataEntity(msg)
-        else:
-            warn(msg, MissingDataWarning)
+        self.all_pairs = self._build_all_pairs()
+        #: The primary ``CancerMatchedSamplePair``
+        self.primary_pair = self.all_pairs[0] if self.all_pairs else None
 
-    def _iter_tumor_bio_samples(self):
-        """Return iterable over all cancer bio samples
+    def _build_all_pairs(self):
+        """Return list of all tumor/normal pairs
 
-        The order depends on the order in ``self.bio_samples``.  If
-        the type of this attribute is an ordered dict, then the behaviour of
-        this function is reproducible, otherwise it is not.
+        The bio samples are classified into the primary normal and the tumor
+        samples in a single pass.  The order of the tumor samples depends on
+        the order in ``self.bio_samples``.  If the type of this attribute is
+        an ordered dict, then the behaviour of this function is reproducible,
+        otherwise it is not.
 
         Raises ``MissingDataEntity`` in the case of problems
         """
-        yielded_any = False
+        normal_bio_sample = None
+        tumor_bio_samples = []
         for bio_sample in self.bio_samples.values():
             if KEY_IS_TUMOR not in bio_sample.extra_infos:
                 raise MissingDataEntity(  # pragma: no cover
                     'Could not find "{}" flag in BioSample {}'.format(KEY_IS_TUMOR, bio_sample)
                 )
             elif bio_sample.extra_infos[KEY_IS_TUMOR]:
-                yielded_any = True
-                yield bio_sample
-        if not yielded_any:
+                tumor_bio_samples.append(bio_sample)
+            elif normal_bio_sample is None:
+                normal_bio_sample = bio_sample
+        if normal_bio_sample is None:
+            # Having no normal sample is an error by default but this behaviour
+            # can be switched off.
+            tpl = "Could not find primary normal sample for BioEntity {}"
+            msg = tpl.format(self.bio_entity)
+            if not self.sheet.options.allow_missing_normal:  # pragma: no cover
+                raise MissingDataEntity(msg)
+            warn(msg, MissingDataWarning)
+            return []
+        if not tumor_bio_samples:
             # Having no tumor sample is an error by default but this behaviour
             # can be switched off.
             tpl = "Could not find a BioSample with {} = true for BioEntity {}"
             msg = tpl.format(KEY_IS_TUMOR, self.bio_entity)
             if not self.sheet.options.allow_missing_tumor:
                 raise MissingDataEntity(msg)  # pragma: no cover
-            else:
-                warn(msg, MissingDataWarning)
+            warn(msg, MissingDataWarning)
+        return [
+            CancerMatchedSamplePair(self, tumor_bio_sample, normal_bio_sample)
+            for tumor_bio_sample in tumor_bio_samples
+        ]
 
     def __repr__(self):
         return "CancerDonor({})".format(", ".join(map(str, [self.sheet, self.bio_entity])))
@@ -2,9 +2,7 @@
 """Shortcuts for generic sample sheets
 """
 
-from collections import OrderedDict
-
-from .base import ShortcutMixin, ShortcutSampleSheet
+from .base import LazyShortcutMapping, ShortcutMixin, ShortcutSampleSheet
 
 __author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
 
@@ -17,22 +15,35 @@ class GenericSampleSheet(ShortcutSampleSheet):
 
     def __init__(self, sheet):
         super().__init__(sheet)
-        #: Generic wrapper BioEntity objects
-        self.bio_entities = OrderedDict(self._build_bio_entities())
-        #: List of all NGS libraries
-        self.all_ngs_libraries = []
-        #: List of the primary NGS libraries for each bio sample
-        self.primary_ngs_libraries = []
-        # Build the shortcuts
-        self._build_shortcuts()
-
-    def _build_bio_entities(self):
-        """Build GenericBioEntity objects for ``self.sheet``"""
-        for name, bio_entity in self.sheet.bio_entities.items():
-            yield name, GenericBioEntity(self, bio_entity)
+        #: Generic wrapper BioEntity objects, created on first access
+        self.bio_entities = LazyShortcutMapping(self.sheet.bio_entities, self, GenericBioEntity)
+
+    @property
+    def all_ngs_libraries(self):
+        """List of all enabled NGS libraries, computed on first access"""
+        if self._all_ngs_libraries is None:
+            self._build_shortcuts()
+        return self._all_ngs_libraries
+
+    @all_ngs_libraries.setter
+    def all_ngs_libraries(self, value):
+        self._all_ngs_libraries = value
+
+    @property
+    def primary_ngs_libraries(self):
+        """List of the primary NGS libraries for each bio sample, computed on first access"""
+        if self._primary_ngs_libraries is None:
+            self._build_shortcuts()
+        return self._primary_ngs_libraries
+
+    @primary_ngs_libraries.setter
+    def primary_ngs_libraries(self, value):
+        self._primary_ngs_libraries = value
 
     def _build_shortcuts(self):
         # Build self.{all,primary}_ngs_libraries
+        self._all_ngs_libraries = []
+        self._primary_ngs_libraries = []
         for bio_entity in self.bio_entities.values():
             for bio_sample in bio_entity.bio_samples.values():
                 primary = True
@@ -40,9 +51,9 @@ class GenericSampleSheet(ShortcutSampleSheet):
                     for ngs_library in test_sample.ngs_libraries.values():
                         if ngs_library.disabled:
                             continue
-                        self.all_ngs_libraries.append(ngs_library)
+                        self._all_ngs_libraries.append(ngs_library)
                         if primary:
-                            self.primary_ngs_libraries.append(ngs_library)
+                            self._primary_ngs_libraries.append(ngs_library)
                             primary = False
 
 
@@ -75,14 +86,10 @@ class GenericTestSample(ShortcutMixin):
         self.wrapped = test_sample
         #: Wrapped TestSample
         self.test_sample = test_sample
-        #: Shortcut to NGSLibrary objects
-        self.ngs_libraries = OrderedDict(self._build_ngs_libraries())
-
-    def _build_ngs_libraries(self):
-        """BuildGenericNGSLibrary objects from
-        ``self.test_sample.ngs_libraries"""
-        for name, ngs_library in self.test_sample.ngs_libraries.items():
-            yield name, self.__class__.ngs_library_class(self, ngs_library)
+        #: Shortcut to NGSLibrary objects, created on first access
+        self.ngs_libraries = LazyShortcutMapping(
+            test_sample.ngs_libraries, self, self.__class__.ngs_library_class
+        )
 
 
 class GenericBioSample(ShortcutMixin):
@@ -100,13 +107,10 @@ class GenericBioSample(ShortcutMixin):
         self.wrapped = bio_sample
         #: Wrapped BioSample
         self.bio_sample = bio_sample
-        #: Shortcut BioSample objects
-        self.test_samples = OrderedDict(self._build_test_samples())
-
-    def _build_test_samples(self):
-        """Build GenericTestSample objects for ``self.bio_sample.test_samples``"""
-        for name, test_sample in self.bio_sample.test_samples.items():
-            yield name, self.__class__.test_sample_class(self, test_sample)
+        #: Shortcut TestSample objects, created on first access
+        self.test_samples = LazyShortcutMapping(
+            bio_sample.test_samples, self, self.__class__.test_sample_class
+        )
 
 
 class GenericBioEntity(ShortcutMixin):
@@ -124,10 +128,7 @@ class GenericBioEntity(ShortcutMixin):
         self.wrapped = bio_entity
         #: Wrapped BioEntity
         self.bio_entity = bio_entity
-        #: Shortcut BioSample objects
-        self.bio_samples = OrderedDict(self._build_bio_samples())
-
-    def _build_bio_samples(self):
-        """Build GenericBioSample objects for ``self.bio_entity.bio_samples``"""
-        for name, bio_sample in self.bio_entity.bio_samples.items():
-            yield name, self.__class__.bio_sample_class(self, bio_sample)
+        #: Shortcut BioSample objects, created on first access
+        self.bio_samples = LazyShortcutMapping(
+            bio_entity.bio_samples, self, self.__class__.bio_sample_class
+        )
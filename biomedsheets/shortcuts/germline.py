@@ -3,10 +3,13 @@
 """
 
 from collections import OrderedDict, defaultdict
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+import gzip
+from itertools import chain, islice
 from warnings import warn
 
-from ..union_find import UnionFind
+from ..union_find import InternedUnionFind
 from .base import (
     EXTRACTION_TYPE_DNA,
     EXTRACTION_TYPE_RNA,
@@ -38,6 +41,22 @@ KEY_MOTHER_PK = "motherPk"
 #: Key value for "sex".
 KEY_SEX = "sex"
 
+#: Mapping from "is affected" value to PED file value
+PED_AFFECTED = {"affected": "2", "unaffected": "1", "unknown": "0"}
+
+#: Mapping from "sex" value to PED file value
+PED_SEX = {"male": "1", "female": "2", "unknown": "0"}
+
+#: Number of lines to buffer before writing to PED files
+PED_CHUNK_LINES = 8192
+
+#: Compression level for gzip-compressed PED files
+PED_GZIP_COMPRESSLEVEL = 6
+
+#: Default number of threads for writing one PED file per pedigree, only pays off with many
+#: CPUs or high-latency file systems
+DEFAULT_PED_WRITE_WORKERS = 1
+
 
 def donor_has_dna_ngs_library(donor):
     """Predicate that returns whether the donor has a dna library."""
@@ -112,21 +131,24 @@ class Pedigree:
         else:
             index = None
 
-        included = set()
-        for donor in filter(predicate, self.donors):
-            included.add(donor.name)
-
-        donors = []
-        for donor in self.donors:
-            if donor.name in included:
-                donor = deepcopy(donor)
-                if not donor._father or donor._father.name not in included:
-                    donor._father = None
-                    donor.extra_infos.pop(KEY_FATHER_PK, None)
-                if not donor._mother or donor._mother.name not in included:
-                    donor._mother = None
-                    donor.extra_infos.pop(KEY_MOTHER_PK, None)
-                donors.append(donor)
+        # Create shallow overlays of the donors passing ``predicate``; they share all shortcut
+        # members with the original ones, only parents and ``extra_infos`` are overridden.
+        overlays = OrderedDict(
+            (donor.name, copy(donor)) for donor in self.donors if predicate(donor)
+        )
+        donors = list(overlays.values())
+        for donor in donors:
+            removed_keys = []
+            for attr, key in (("_father", KEY_FATHER_PK), ("_mother", KEY_MOTHER_PK)):
+                parent = getattr(donor, attr)
+                parent = overlays.get(parent.name) if parent else None
+                setattr(donor, attr, parent)
+                if not parent:
+                    removed_keys.append(key)
+            if any(key in donor.extra_infos for key in removed_keys):
+                donor._extra_infos = donor.extra_infos.copy()
+                for key in removed_keys:
+                    donor._extra_infos.pop(key, None)
 
         return Pedigree(donors, index)
 
@@ -171,48 +193,91 @@ class Pedigree:
         return repr(self)
 
 
-def _append_pedigree_to_ped(pedigree, f):
+def _ped_name(donor):
+    """Return name of ``donor`` in PED files or ``None`` if it is not a germline donor"""
+    if not hasattr(donor, "dna_ngs_library"):
+        return None
+    elif donor.dna_ngs_library is None:
+        return donor.name
+    else:
+        return donor.dna_ngs_library.name
+
+
+def iter_ped_lines(pedigree):
+    """Yield the lines of the PED file for ``pedigree``, including line endings"""
     family = "FAM_" + pedigree.index.name
+    pk_to_donor = pedigree.pk_to_donor
+    # Names in the PED file, computed once per donor
+    ped_names = {id(donor): _ped_name(donor) for donor in pedigree.donors}
     for donor in pedigree.donors:
-        affected = {"affected": "2", "unaffected": "1", "unknown": "0"}[
-            donor.extra_infos.get(KEY_IS_AFFECTED, "unknown")
-        ]
-        sex = {"male": "1", "female": "2", "unknown": "0"}[
-            donor.extra_infos.get(KEY_SEX, "unknown")
-        ]
-        father = "0"
-        if donor.father_pk:
-            if hasattr(pedigree.pk_to_donor[donor.father_pk], "dna_ngs_library"):
-                donor_father = pedigree.pk_to_donor[donor.father_pk]
-                if donor_father.dna_ngs_library is None:
-                    father = donor_father.name
-                else:
-                    father = donor_father.dna_ngs_library.name
-        mother = "0"
-        if donor.mother_pk:
-            if hasattr(pedigree.pk_to_donor[donor.mother_pk], "dna_ngs_library"):
-                donor_mother = pedigree.pk_to_donor[donor.mother_pk]
-                if donor_mother.dna_ngs_library is None:
-                    mother = donor_mother.name
-                else:
-                    mother = donor_mother.dna_ngs_library.name
-        if hasattr(donor, "dna_ngs_library"):
-            if donor.dna_ngs_library is None:
-                name = donor.name
-            else:
-                name = donor.dna_ngs_library.name
-            print("\t".join((family, name, father, mother, sex, affected)), file=f)
+        extra_infos = donor.extra_infos
+        affected = PED_AFFECTED[extra_infos.get(KEY_IS_AFFECTED, "unknown")]
+        sex = PED_SEX[extra_infos.get(KEY_SEX, "unknown")]
+        father_pk = extra_infos.get(KEY_FATHER_PK)
+        father = (ped_names[id(pk_to_donor[father_pk])] or "0") if father_pk else "0"
+        mother_pk = extra_infos.get(KEY_MOTHER_PK)
+        mother = (ped_names[id(pk_to_donor[mother_pk])] or "0") if mother_pk else "0"
+        name = ped_names[id(donor)]
+        if name is not None:
+            yield "\t".join((family, name, father, mother, sex, affected)) + "\n"
 
 
-def write_pedigree_to_ped(pedigree, path):
-    with open(path, "wt") as f:
-        _append_pedigree_to_ped(pedigree, f)
+def _append_pedigree_to_ped(pedigree, f):
+    _write_chunked(f, iter_ped_lines(pedigree))
 
 
-def write_pedigrees_to_ped(pedigrees, path):
-    with open(path, "wt") as f:
-        for pedigree in pedigrees:
-            _append_pedigree_to_ped(pedigree, f)
+def _write_chunked(f, lines):
+    """Write ``lines`` to ``f`` in chunks of ``PED_CHUNK_LINES`` lines"""
+    lines = iter(lines)
+    while True:
+        chunk = "".join(islice(lines, PED_CHUNK_LINES))
+        if not chunk:
+            break
+        f.write(chunk)
+
+
+def _open_ped(path, compress):
+    """Open PED file at ``path`` for writing, gzip-compressed if ``compress`` or, if ``None``,
+    ``path`` ends in ``.gz``
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        return gzip.open(path, "wt", compresslevel=PED_GZIP_COMPRESSLEVEL)
+    else:
+        return open(path, "wt")
+
+
+def write_pedigree_to_ped(pedigree, path, compress=None):
+    write_pedigrees_to_ped([pedigree], path, compress)
+
+
+def write_pedigrees_to_ped(pedigrees, path, compress=None):
+    with _open_ped(path, compress) as f:
+        _write_chunked(f, chain.from_iterable(map(iter_ped_lines, pedigrees)))
+
+
+def write_pedigrees_to_ped_files(
+    pedigrees, path_template, compress=None, workers=DEFAULT_PED_WRITE_WORKERS
+):
+    """Write one PED file per pedigree and return list of the paths
+
+    The path is created by ``path_template.format(family=...)`` with the family name from
+    the PED file.  Each file is written as its lines are generated, in ``workers`` threads
+    if ``workers > 1``.
+    """
+
+    def write(pedigree):
+        path = path_template.format(family="FAM_" + pedigree.index.name)
+        with _open_ped(path, compress) as f:
+            _write_chunked(f, iter_ped_lines(pedigree))
+        return path
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(write, pedigrees))
+    else:
+        return list(map(write, pedigrees))
 
 
 class Cohort:
@@ -223,7 +288,8 @@ class Cohort:
 
     Note that the shortcut members are set upon creation.  When pedigrees are
     modified after the construction, the ``update_shortcuts()`` method must
-    be called.
+    be called.  Use ``add_pedigree()`` and ``remove_pedigree()`` for only
+    updating the shortcut members of single pedigrees.
     """
 
     def __init__(self, pedigrees=None):
@@ -231,8 +297,8 @@ class Cohort:
         self.pedigrees = list(pedigrees or [])
         #: List of all index individuals of all pedigrees
         self.indices = []
-        #: List of all affected individuals of all pedigrees
-        self.affecteds = []
+        # List of all affected individuals of all pedigrees, ``None`` if it must be rebuilt
+        self._affecteds = []
         #: Mapping from individual name to pedigree
         self.name_to_pedigree = {}
         #: Mapping from individual pk to pedigree
@@ -258,11 +324,24 @@ class Cohort:
         """Return number of pedigrees in the cohort"""
         return len(self.pedigrees)
 
+    @property
+    def affecteds(self):
+        """List of all affected individuals of all pedigrees, rebuilt on first access after
+        ``add_pedigree()`` or ``remove_pedigree()``
+        """
+        if self._affecteds is None:
+            self._affecteds = list(chain.from_iterable(p.affecteds for p in self.pedigrees))
+        return self._affecteds
+
+    @affecteds.setter
+    def affecteds(self, value):
+        self._affecteds = value
+
     def update_shortcuts(self):
         """Update the shortcut members"""
         # Re-build lists of index and affected individuals
         self.indices = [p.index for p in self.pedigrees]
-        self.affecteds = sum((p.affecteds for p in self.pedigrees), [])
+        self.affecteds = list(chain.from_iterable(p.affecteds for p in self.pedigrees))
         # Re-build mappings
         self.name_to_pedigree = {}
         self.pk_to_pedigree = {}
@@ -271,39 +350,72 @@ class Cohort:
         self.pk_to_donor = {}
         self.secondary_id_to_donor = {}
         for pedigree in self.pedigrees:
-            # Update {name,pk,secondary_id} to pedigree mapping
-            self._checked_update(
-                self.name_to_pedigree, {d.name: pedigree for d in pedigree.donors}, "name"
-            )
-            self._checked_update(
-                self.pk_to_pedigree, {d.pk: pedigree for d in pedigree.donors}, "pk"
-            )
-            self._checked_update(
-                self.secondary_id_to_pedigree,
-                {d.secondary_id: pedigree for d in pedigree.donors},
-                "secondary id",
-            )
-            # Update {name,pk,secondary_id} to donor mapping
-            self._checked_update(self.name_to_donor, {d.name: d for d in pedigree.donors}, "name")
-            self._checked_update(self.pk_to_donor, {d.pk: d for d in pedigree.donors}, "pk")
-            self._checked_update(
-                self.secondary_id_to_donor,
-                {d.secondary_id: d for d in pedigree.donors},
-                "secondary id",
-            )
+            self._add_to_mappings(pedigree)
+
+    def iter_ped_lines(self):
+        """Return iterator over the lines of the PED file for all pedigrees, including line
+        endings
+        """
+        return chain.from_iterable(map(iter_ped_lines, self.pedigrees))
+
+    def write_ped(self, path, compress=None):
+        """Write PED file for all pedigrees to ``path``, gzip-compressed if ``compress`` or,
+        if ``None``, ``path`` ends in ``.gz``
+        """
+        write_pedigrees_to_ped(self.pedigrees, path, compress)
+
+    def write_ped_files(self, path_template, compress=None, workers=DEFAULT_PED_WRITE_WORKERS):
+        """Write one PED file per pedigree, see ``write_pedigrees_to_ped_files()``"""
+        return write_pedigrees_to_ped_files(self.pedigrees, path_template, compress, workers)
 
-    def _checked_update(self, dest, other, msg_token):
-        """Check overlap of keys between ``dest`` and ``other``, update and
-        return dest
+    def add_pedigree(self, pedigree, position=None):
+        """Insert ``pedigree`` at ``position`` (default is to append) and update the shortcut
+        members for it only
 
-        In case of error, use ``msg_token`` for exception message.
+        Raises ``ValueError`` on duplicate donor names, pks, or secondary IDs, the cohort is
+        unchanged in this case.
+        """
+        self._add_to_mappings(pedigree)
+        if position is None:
+            position = len(self.pedigrees)
+        self.pedigrees.insert(position, pedigree)
+        self.indices.insert(position, pedigree.index)
+        self._affecteds = None
+
+    def remove_pedigree(self, pedigree):
+        """Remove ``pedigree`` and update the shortcut members for it only"""
+        position = self.pedigrees.index(pedigree)
+        del self.pedigrees[position]
+        del self.indices[position]
+        self._affecteds = None
+        for donor in pedigree.donors:
+            del self.name_to_pedigree[donor.name]
+            del self.pk_to_pedigree[donor.pk]
+            del self.secondary_id_to_pedigree[donor.secondary_id]
+            del self.name_to_donor[donor.name]
+            del self.pk_to_donor[donor.pk]
+            del self.secondary_id_to_donor[donor.secondary_id]
+
+    def _add_to_mappings(self, pedigree):
+        """Add the donors of ``pedigree`` to the {name,pk,secondary_id} mappings
+
+        All keys are checked first so the mappings are unchanged on errors.  Only keys
+        that are already used by other pedigrees are duplicates.
         """
-        overlap = set(dest.keys()) & set(other.keys())
-        if overlap:
-            tpl = "Duplicate {}s when building " "cohort shortcuts: {}"  # pramga: no cover
-            raise ValueError(tpl.format(msg_token, list(sorted(overlap))))  # pramga: no cover
-        dest.update(other)
-        return dest
+        keys = [(d.name, d.pk, d.secondary_id) for d in pedigree.donors]
+        to_pedigrees = (self.name_to_pedigree, self.pk_to_pedigree, self.secondary_id_to_pedigree)
+        for i, (dest, msg_token) in enumerate(zip(to_pedigrees, ("name", "pk", "secondary id"))):
+            overlap = {key[i] for key in keys if key[i] in dest}
+            if overlap:
+                tpl = "Duplicate {}s when building " "cohort shortcuts: {}"  # pramga: no cover
+                raise ValueError(tpl.format(msg_token, list(sorted(overlap))))  # pramga: no cover
+        for donor, (name, pk, secondary_id) in zip(pedigree.donors, keys):
+            self.name_to_pedigree[name] = pedigree
+            self.pk_to_pedigree[pk] = pedigree
+            self.secondary_id_to_pedigree[secondary_id] = pedigree
+            self.name_to_donor[name] = donor
+            self.pk_to_donor[pk] = donor
+            self.secondary_id_to_donor[secondary_id] = donor
 
 
 class CohortBuilder:
@@ -405,16 +517,21 @@ class CohortBuilder:
         """
         # Initialise variable
         partition = OrderedDict()
-        # Use Union-Find data structure for gathering pedigree donors
-        union_find = UnionFind()
-        for donor in self.donors:
-            for parent_pk in (pk for pk in (donor.father_pk, donor.mother_pk) if pk):
-                # String conversion is necessary because "fatherPk" and
-                # "motherPk" are given with type "str" in std_fields.json
-                union_find.union(str(donor.pk), parent_pk)
+        # Use Union-Find data structure for gathering pedigree donors, the string conversion of
+        # the donor PKs is necessary because "fatherPk" and "motherPk" are given with type "str"
+        # in std_fields.json; each PK is converted and interned only once
+        union_find = InternedUnionFind()
+        donor_idxs = [union_find.intern(str(donor.pk)) for donor in self.donors]
+        union_find.sets.union_many(
+            (donor_idx, union_find.intern(parent_pk))
+            for donor_idx, donor in zip(donor_idxs, self.donors)
+            for parent_pk in (donor.father_pk, donor.mother_pk)
+            if parent_pk
+        )
         # Partition the donors
-        for donor in self.donors:
-            partition.setdefault(union_find[str(donor.pk)], []).append(donor)
+        find = union_find.sets.find
+        for donor_idx, donor in zip(donor_idxs, self.donors):
+            partition.setdefault(find(donor_idx), []).append(donor)
         # Return
         return partition
 
@@ -430,6 +547,9 @@ class GermlineDonor(GenericBioEntity):
         # ``GermlineDonor`` object for mother, access via property, set in
         # ``CohortBuilder``
         self._mother = None
+        # Overriding ``extra_infos`` of the wrapped object, used in the overlays created by
+        # ``Pedigree.with_filtered_donors()``
+        self._extra_infos = None
         #: The primary bio sample with DNA
         self.dna_bio_sample = self._get_primary_dna_bio_sample()
         #: The primary bio sample with RNA, if any
@@ -443,6 +563,13 @@ class GermlineDonor(GenericBioEntity):
         #: The primary RNA NGS library for this sample, if any
         self.rna_ngs_library = self._get_primary_rna_ngs_library()
 
+    @property
+    def extra_infos(self):
+        """Shorcut to wrapped object's ``extra_infos`` unless overridden"""
+        if self._extra_infos is None:
+            return self.wrapped.extra_infos
+        return self._extra_infos
+
     @property
     def is_affected(self):
         """Return whether or not the donor is affected"""
@@ -574,7 +701,12 @@ class GermlineDonor(GenericBioEntity):
 
 
 class GermlineCaseSheet(ShortcutSampleSheet):
-    """Shortcut for "germline" view on bio-medical sample sheets"""
+    """Shortcut for "germline" view on bio-medical sample sheets
+
+    Use ``add_donor()``, ``remove_donor()``, and ``update_donor()`` for modifying the sheet
+    without a full rebuild.  The result is the same as the one of a full rebuild, except that
+    the entries for changed pedigrees and donors are moved to the end of the mappings.
+    """
 
     bio_entity_class = GermlineDonor
 
@@ -593,37 +725,197 @@ class GermlineCaseSheet(ShortcutSampleSheet):
         :type join_by_field: str
         """
         super().__init__(sheet)
+        #: Field used for joining donors into pedigrees, ``None`` for using the row information
+        self.join_by_field = join_by_field
         #: List of donors in the sample sheet
         self.donors = list(self._iter_donors())
+        # Rank of each donor for keeping the order of donors and pedigrees on updates
+        self._donor_rank = {donor: rank for rank, donor in enumerate(self.donors)}
+        # Rank of the next donor to add
+        self._next_rank = len(self.donors)
         #: :py:class:`Cohort` object with the pedigrees and donors built from
         #: the sample sheet
         self.cohort = CohortBuilder(self.donors, join_by_field).run()
+        # Mapping from ``join_by_field`` value to pedigree, empty without ``join_by_field``
+        self._join_value_to_pedigree = dict(self._join_values(self.cohort.pedigrees))
         #: Mapping from index DNA NGS library name to pedigree
-        self.index_ngs_library_to_pedigree = OrderedDict(self._index_ngs_library_to_pedigree())
+        self.index_ngs_library_to_pedigree = OrderedDict(
+            self._index_ngs_library_to_pedigree(self.cohort.pedigrees)
+        )
         #: Mapping from any DNA NGS library name in pedigree to pedigree
         self.donor_ngs_library_to_pedigree = OrderedDict(
-            [
-                (donor.dna_ngs_library.name, pedigree)
-                for pedigree in self.cohort.pedigrees
-                for donor in pedigree.donors
-                if donor.dna_ngs_library
-            ]
+            self._donor_ngs_library_to_pedigree(self.cohort.pedigrees)
         )
         #: Mapping from DNA NGS library name to donor
-        self.index_ngs_library_to_donor = OrderedDict(
-            [(donor.dna_ngs_library.name, donor) for donor in self.donors if donor.dna_ngs_library]
-        )
+        self.index_ngs_library_to_donor = OrderedDict(self._ngs_library_to_donor(self.donors))
         #: Mapping from library name to object
-        self.library_name_to_library = OrderedDict(self._library_name_to_library())
+        self.library_name_to_library = OrderedDict(self._library_name_to_library(self.donors))
+
+    def add_donor(self, bio_entity):
+        """Add ``BioEntity`` to the sheet and return the new :py:class:`GermlineDonor`
+
+        Only the pedigrees of the new donor's parents (or with the same value of the
+        ``join_by_field``) are rebuilt and merged into one; the shortcut members are updated
+        for these pedigrees only.
+        """
+        donor = GermlineDonor(self, bio_entity)
+        self._check_new_donor(donor, None)
+        self.sheet.add_bio_entity(bio_entity)
+        self._donor_rank[donor] = self._next_rank
+        try:
+            self._update_pedigrees([donor], [])
+        except Exception:
+            del self._donor_rank[donor]
+            self.sheet.remove_bio_entity(bio_entity.secondary_id)
+            raise
+        self._next_rank += 1
+        self.donors.append(donor)
+        return donor
+
+    def remove_donor(self, donor):
+        """Remove :py:class:`GermlineDonor` and its ``BioEntity`` from the sheet
+
+        The pedigree of the donor is rebuilt from the remaining members and may be split up.
+        Raises ``ValueError`` if the donor is the parent of another donor.
+        """
+        self._check_no_children(donor)
+        self._update_pedigrees([], [donor])
+        self.sheet.remove_bio_entity(donor.secondary_id)
+        del self._donor_rank[donor]
+        self.donors.remove(donor)
+
+    def update_donor(self, bio_entity):
+        """Replace the donor with the secondary ID of ``bio_entity`` and return the new
+        :py:class:`GermlineDonor`
+
+        The new donor keeps the position of the old one.  Only the pedigrees of the old and
+        new donor are rebuilt.
+        """
+        old_donor = self.cohort.secondary_id_to_donor[bio_entity.secondary_id]
+        donor = GermlineDonor(self, bio_entity)
+        if str(donor.pk) != str(old_donor.pk):
+            self._check_no_children(old_donor)
+        self._check_new_donor(donor, old_donor)
+        self.sheet.replace_bio_entity(bio_entity)
+        self._donor_rank[donor] = self._donor_rank[old_donor]
+        try:
+            self._update_pedigrees([donor], [old_donor])
+        except Exception:
+            del self._donor_rank[donor]
+            self.sheet.replace_bio_entity(old_donor.bio_entity)
+            raise
+        del self._donor_rank[old_donor]
+        self.donors[self.donors.index(old_donor)] = donor
+        return donor
+
+    def _check_new_donor(self, donor, old_donor):
+        """Raise ``ValueError`` if the name, pk, or secondary ID of ``donor`` is taken by a
+        donor other than ``old_donor``
+        """
+        for attr, msg_token in (("name", "name"), ("pk", "pk"), ("secondary_id", "secondary id")):
+            other = getattr(self.cohort, attr + "_to_donor").get(getattr(donor, attr))
+            if other is not None and other is not old_donor:
+                tpl = "Duplicate {}s when building cohort shortcuts: {}"
+                raise ValueError(tpl.format(msg_token, [getattr(donor, attr)]))
+
+    def _check_no_children(self, donor):
+        """Raise ``ValueError`` if ``donor`` is the parent of another donor"""
+        pk = str(donor.pk)
+        children = [
+            d.name
+            for d in self.cohort.name_to_pedigree[donor.name].donors
+            if pk in (d.father_pk, d.mother_pk)
+        ]
+        if children:
+            tpl = "Donor {} is the parent of donors {}"
+            raise ValueError(tpl.format(donor.name, children))
+
+    def _related_pedigrees(self, added, removed):
+        """Return list of the pedigrees affected by adding and removing donors"""
+        result = OrderedDict()
+        for donor in removed:
+            pedigree = self.cohort.name_to_pedigree[donor.name]
+            result[id(pedigree)] = pedigree
+        for donor in added:
+            if self.join_by_field:
+                value = donor.extra_infos.get(self.join_by_field)
+                pedigrees = [self._join_value_to_pedigree.get(value)]
+            else:
+                pedigrees = [
+                    self.cohort.pk_to_pedigree.get(int(pk))
+                    for pk in (donor.father_pk, donor.mother_pk)
+                    if pk
+                ]
+            result.update((id(p), p) for p in pedigrees if p is not None)
+        return list(result.values())
+
+    def _update_pedigrees(self, added, removed):
+        """Rebuild the pedigrees affected by adding and removing donors and update the cohort
+        and the mappings of this sheet for them
+        """
+        old_pedigrees = self._related_pedigrees(added, removed)
+        removed_ids = {id(donor) for donor in removed}
+        members = [d for p in old_pedigrees for d in p.donors if id(d) not in removed_ids]
+        members = sorted(members + added, key=self._donor_rank.__getitem__)
+        # Build the new pedigrees first, this raises in the case of problems
+        links = [(donor, donor._father, donor._mother) for donor in members]
+        try:
+            new_pedigrees = CohortBuilder(members, self.join_by_field).run().pedigrees
+        except Exception:
+            for donor, father, mother in links:
+                donor._father, donor._mother = father, mother
+            raise
+        # Remove old pedigrees and donors from cohort and mappings
+        for pedigree in old_pedigrees:
+            self.cohort.remove_pedigree(pedigree)
+            if pedigree.index.dna_ngs_library:
+                name = pedigree.index.dna_ngs_library.name
+                if self.index_ngs_library_to_pedigree.get(name) is pedigree:
+                    del self.index_ngs_library_to_pedigree[name]
+            for name, _ in self._donor_ngs_library_to_pedigree([pedigree]):
+                del self.donor_ngs_library_to_pedigree[name]
+            for value, _ in self._join_values([pedigree]):
+                del self._join_value_to_pedigree[value]
+        for name, _ in self._ngs_library_to_donor(removed):
+            del self.index_ngs_library_to_donor[name]
+        for name, _ in self._library_name_to_library(removed):
+            del self.library_name_to_library[name]
+        # Add new pedigrees and donors to cohort and mappings
+        for pedigree in new_pedigrees:
+            self.cohort.add_pedigree(pedigree, self._pedigree_position(pedigree))
+        self.index_ngs_library_to_pedigree.update(
+            self._index_ngs_library_to_pedigree(new_pedigrees)
+        )
+        self.donor_ngs_library_to_pedigree.update(
+            self._donor_ngs_library_to_pedigree(new_pedigrees)
+        )
+        self._join_value_to_pedigree.update(self._join_values(new_pedigrees))
+        self.index_ngs_library_to_donor.update(self._ngs_library_to_donor(added))
+        self.library_name_to_library.update(self._library_name_to_library(added))
+
+    def _pedigree_position(self, pedigree):
+        """Return position of ``pedigree`` in ``self.cohort.pedigrees`` by rank of the first
+        donor, as in the order of a full rebuild
+        """
+        rank = self._donor_rank[pedigree.donors[0]]
+        pedigrees = self.cohort.pedigrees
+        lo, hi = 0, len(pedigrees)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._donor_rank[pedigrees[mid].donors[0]] < rank:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
 
     def _iter_donors(self):
         """Return iterator over the donors in the study"""
         for bio_entity in self.sheet.bio_entities.values():
             yield GermlineDonor(self, bio_entity)
 
-    def _index_ngs_library_to_pedigree(self):
+    def _index_ngs_library_to_pedigree(self, pedigrees):
         """Build mapping from NGS library name to pedigree"""
-        for pedigree in self.cohort.pedigrees:
+        for pedigree in pedigrees:
             if not pedigree.index:
                 raise ValueError(  # pragma: no cover
                     "Found pedigree without index! {}".format(pedigree)
@@ -636,9 +928,33 @@ class GermlineCaseSheet(ShortcutSampleSheet):
                 continue
             yield pedigree.index.dna_ngs_library.name, pedigree
 
-    def _library_name_to_library(self):
+    def _join_values(self, pedigrees):
+        """Yield mapping from ``join_by_field`` value to pedigree, nothing without
+        ``join_by_field``
+        """
+        if self.join_by_field:
+            for pedigree in pedigrees:
+                yield pedigree.donors[0].extra_infos.get(self.join_by_field), pedigree
+
+    @staticmethod
+    def _donor_ngs_library_to_pedigree(pedigrees):
+        """Yield mapping from any DNA NGS library name in ``pedigrees`` to pedigree"""
+        for pedigree in pedigrees:
+            for donor in pedigree.donors:
+                if donor.dna_ngs_library:
+                    yield donor.dna_ngs_library.name, pedigree
+
+    @staticmethod
+    def _ngs_library_to_donor(donors):
+        """Yield mapping from DNA NGS library name to donor"""
+        for donor in donors:
+            if donor.dna_ngs_library:
+                yield donor.dna_ngs_library.name, donor
+
+    @staticmethod
+    def _library_name_to_library(donors):
         """Yield mapping from library name to library"""
-        for donor in self.donors:
+        for donor in donors:
             for bio_sample in donor.bio_samples.values():
                 for test_sample in bio_sample.test_samples.values():
                     for ngs_library in test_sample.ngs_libraries.values():
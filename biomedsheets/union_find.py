@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """Union-find data structure"""
 
+from array import array
+
 
 class UnionFind:
     """Union-find data structure.
@@ -61,3 +63,127 @@ class UnionFind:
             if r != heaviest:
                 self.weights[heaviest] += self.weights[r]
                 self.parents[r] = heaviest
+
+
+class ArrayUnionFind:
+    """Union-find data structure over the integers ``0, ..., len(X) - 1``.
+
+    Parents and set sizes are stored in ``array("l")`` objects.  New
+    singleton sets are created with ``X.add()``, ``X.find(i)`` returns the
+    representative of the set containing ``i`` and uses path halving.  Sets
+    are merged with union by size through ``X.union(i, j)`` or, for many
+    pairs at once, ``X.union_many(pairs)``.
+    """
+
+    def __init__(self, count=0):
+        """Create a new union-find structure with ``count`` singleton sets"""
+        #: Parent index for each item, roots are their own parents
+        self.parents = array("l", range(count))
+        #: Size of the set for root items, undefined for other items
+        self.sizes = array("l", [1]) * count
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self):
+        """Add a new singleton set and return its index"""
+        idx = len(self.parents)
+        self.parents.append(idx)
+        self.sizes.append(1)
+        return idx
+
+    def find(self, idx):
+        """Return the representative of the set containing ``idx``"""
+        parents = self.parents
+        parent = parents[idx]
+        while parent != idx:
+            # path halving: point each visited item to its grand parent
+            grand_parent = parents[parent]
+            parents[idx] = grand_parent
+            idx, parent = grand_parent, parents[grand_parent]
+        return idx
+
+    def union(self, idx1, idx2):
+        """Merge the sets containing ``idx1`` and ``idx2``, return new representative"""
+        root1, root2 = self.find(idx1), self.find(idx2)
+        if root1 == root2:
+            return root1
+        sizes = self.sizes
+        if sizes[root1] < sizes[root2]:
+            root1, root2 = root2, root1
+        self.parents[root2] = root1
+        sizes[root1] += sizes[root2]
+        return root1
+
+    def union_many(self, pairs):
+        """Merge the sets for each pair ``(idx1, idx2)`` in the iterable ``pairs``
+
+        Equivalent to calling ``union()`` for each pair but with the lookups
+        of the loop hoisted and ``find()`` inlined.
+        """
+        parents, sizes = self.parents, self.sizes
+        for idx1, idx2 in pairs:
+            parent = parents[idx1]
+            while parent != idx1:
+                grand_parent = parents[parent]
+                parents[idx1] = grand_parent
+                idx1, parent = grand_parent, parents[grand_parent]
+            parent = parents[idx2]
+            while parent != idx2:
+                grand_parent = parents[parent]
+                parents[idx2] = grand_parent
+                idx2, parent = grand_parent, parents[grand_parent]
+            if idx1 != idx2:
+                if sizes[idx1] < sizes[idx2]:
+                    idx1, idx2 = idx2, idx1
+                parents[idx2] = idx1
+                sizes[idx1] += sizes[idx2]
+
+
+class InternedUnionFind:
+    """Union-find data structure for hashable keys backed by ``ArrayUnionFind``
+
+    Offers the same interface as ``UnionFind`` but interns each key to an
+    integer index once so that the unions and finds work on integers only.
+    Sets are named by their representative key.
+    """
+
+    def __init__(self, keys=()):
+        """Create a new union-find structure with a singleton set for each of ``keys``"""
+        #: Mapping from key to integer index
+        self.key_to_index = {}
+        #: List of keys, by integer index
+        self.keys = []
+        #: The integer-indexed union-find structure
+        self.sets = ArrayUnionFind()
+        for key in keys:
+            self.intern(key)
+
+    def intern(self, key):
+        """Return integer index for ``key``, creating a singleton set if it is new"""
+        idx = self.key_to_index.get(key)
+        if idx is None:
+            idx = self.key_to_index[key] = self.sets.add()
+            self.keys.append(key)
+        return idx
+
+    def __getitem__(self, key):
+        """Find and return the name of the set containing the key"""
+        return self.keys[self.sets.find(self.intern(key))]
+
+    def __iter__(self):
+        """Iterate through all items ever found or unioned by this structure"""
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def union(self, *keys):
+        """Find the sets containing the keys and merge them all"""
+        idxs = [self.intern(key) for key in keys]
+        self.sets.union_many(zip(idxs, idxs[1:]))
+
+    def union_many(self, pairs):
+        """Merge the sets for each pair of keys in the iterable ``pairs``"""
+        intern = self.intern
+        self.sets.union_many((intern(key1), intern(key2)) for key1, key2 in pairs)
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""Tests for the columnar sheet representation"""
+
+import collections
+from concurrent.futures import ProcessPoolExecutor
+import io
+import json
+import os
+import textwrap
+
+import pytest
+
+from biomedsheets import columnar, io_tsv, ref_resolver, shortcuts
+from biomedsheets.io import SheetBuilder, json_loads_ordered
+
+__author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
+
+
+@pytest.fixture
+def sheet_germline():
+    """Return ``Sheet`` for a germline example with two trios"""
+    f = io.StringIO(
+        textwrap.dedent(
+            """
+    [Metadata]
+    schema\tgermline_variants
+    schema_version\tv1
+    title\tExample germline study
+    description\tSimple study with two trios
+
+    [Data]
+    patientName\tfatherName\tmotherName\tsex\tisAffected\tlibraryType\tfolderName\thpoTerms
+    index1\tfather1\tmother1\tM\tY\tWES\tindex1\tHP:0009946,HP:0009899
+    father1\t0\t0\tM\tN\tWES\tfather1\t.
+    mother1\t0\t0\tF\tN\tWES\tmother1\t.
+    index2\tfather2\tmother2\tM\tY\tWES\tindex2\t.
+    father2\t0\t0\tM\tN\tWES\tfather2\t.
+    mother2\t0\t0\tF\tN\t.\t.\t.
+    """.lstrip()
+        )
+    )
+    return io_tsv.read_germline_tsv_sheet(f)
+
+
+@pytest.fixture
+def sheet_cancer():
+    """Return ``Sheet`` for the cancer example"""
+    path = os.path.join(os.path.abspath(os.path.dirname(__file__)), "data", "example_cancer.json")
+    sheet_json = json_loads_ordered(open(path, "rt").read())
+    resolver = ref_resolver.RefResolver(dict_class=collections.OrderedDict)
+    return SheetBuilder(resolver.resolve("file://" + path, sheet_json)).run()
+
+
+def _dump(entries):
+    """Return nested list with the attributes of ``entries`` for comparison"""
+    result = []
+    for entry in entries:
+        children = getattr(entry, "sub_entries", {})
+        result.append(
+            (
+                entry.pk,
+                entry.disabled,
+                entry.secondary_id,
+                entry.full_secondary_id,
+                entry.name,
+                entry.extra_ids,
+                dict(entry.extra_infos),
+                list(children),
+                _dump(children.values()),
+            )
+        )
+    return result
+
+
+def test_columnar_germline(sheet_germline, tmp_path):
+    path = str(tmp_path / "sheet.columns")
+    columnar.write_columnar(sheet_germline, path)
+    sheet = columnar.ColumnarSheet.open(path)
+    assert sheet.counts == (6, 5, 5, 5)
+    assert sheet.title == sheet_germline.title
+    assert _dump(sheet.bio_entities.values()) == _dump(sheet_germline.bio_entities.values())
+    ngs_library = sheet.crawl("index1-N1-DNA1-WES1")
+    assert ngs_library.name == sheet_germline.crawl("index1-N1-DNA1-WES1").name
+    assert ngs_library.test_sample.bio_sample.bio_entity is sheet.bio_entities["index1"]
+    assert sheet.bio_entities["index1"].extra_infos["hpoTerms"] == ["HP:0009946", "HP:0009899"]
+    assert isinstance(ngs_library.extra_infos, collections.OrderedDict)
+    # Shortcuts work on the views
+    expected = shortcuts.GermlineCaseSheet(sheet_germline)
+    actual = shortcuts.GermlineCaseSheet(sheet)
+    assert [[d.name for d in p.donors] for p in actual.cohort.pedigrees] == [
+        [d.name for d in p.donors] for p in expected.cohort.pedigrees
+    ]
+    assert list(actual.index_ngs_library_to_pedigree) == list(
+        expected.index_ngs_library_to_pedigree
+    )
+    sheet.close()
+
+
+def test_columnar_cancer(sheet_cancer):
+    sheet = columnar.ColumnarSheet(columnar.build_columnar(sheet_cancer))
+    assert _dump(sheet.bio_entities.values()) == _dump(sheet_cancer.bio_entities.values())
+    expected = shortcuts.CancerCaseSheet(sheet_cancer)
+    actual = shortcuts.CancerCaseSheet(sheet)
+    assert [str(p.tumor_sample.dna_ngs_library.name) for p in actual.all_sample_pairs] == [
+        str(p.tumor_sample.dna_ngs_library.name) for p in expected.all_sample_pairs
+    ]
+
+
+def test_columnar_invalid():
+    with pytest.raises(columnar.ColumnarSheetException):
+        columnar.ColumnarSheet(b"invalid" * 10)
+
+
+def test_columnar_open_invalid(tmp_path, mocker):
+    path = tmp_path / "invalid.bin"
+    path.write_bytes(b"invalid" * 10)
+    buffers = []
+    mmap_type = columnar.mmap.mmap
+
+    def record_mmap(*args, **kwargs):
+        buffers.append(mmap_type(*args, **kwargs))
+        return buffers[-1]
+
+    mocker.patch.object(columnar.mmap, "mmap", side_effect=record_mmap)
+    with pytest.raises(columnar.ColumnarSheetException):
+        columnar.ColumnarSheet.open(str(path))
+    assert len(buffers) == 1 and buffers[0].closed
+
+
+def _pair_library_names(name, fingerprint):
+    """Attach to shared columnar sheet and return library names of the sample pairs"""
+    sheet = columnar.ColumnarSheet.attach(name, fingerprint)
+    result = [
+        p.tumor_sample.dna_ngs_library.name
+        for p in shortcuts.CancerCaseSheet(sheet).all_sample_pairs
+    ]
+    sheet.close()
+    return result
+
+
+def test_columnar_shared_memory(sheet_cancer, sheet_germline):
+    expected = [
+        p.tumor_sample.dna_ngs_library.name
+        for p in shortcuts.CancerCaseSheet(sheet_cancer).all_sample_pairs
+    ]
+    with columnar.SharedColumnarSheet(sheet_cancer) as shared:
+        assert str(shared).startswith("SharedColumnarSheet(")
+        assert shared.name in columnar._PUBLISHED_SEGMENTS
+        sheet = shared.attach()
+        assert sheet.fingerprint == shared.fingerprint
+        assert _dump(sheet.bio_entities.values()) == _dump(sheet_cancer.bio_entities.values())
+        with pytest.raises(TypeError):
+            sheet.buffer[0] = 0
+        sheet.close()
+        # Attach from another process
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(_pair_library_names, shared.name, shared.fingerprint)
+            assert future.result() == expected
+        # Stale segment
+        other = columnar.ColumnarSheet(columnar.build_columnar(sheet_germline))
+        assert other.fingerprint != shared.fingerprint
+        sheet_cancer.title = "Other title"
+        assert columnar.ColumnarSheet(columnar.build_columnar(sheet_cancer)).fingerprint not in (
+            shared.fingerprint,
+            None,
+        )
+        with pytest.raises(columnar.ColumnarSheetException):
+            columnar.ColumnarSheet.attach(shared.name, other.fingerprint)
+    assert shared.shared_memory is None
+    assert shared.name not in columnar._PUBLISHED_SEGMENTS
+
+
+def _drop_heap(header):
+    del header["sections"]["heap"]
+
+
+def _move_heap(header):
+    offset, typecode, count = header["sections"]["heap"]
+    header["sections"]["heap"] = [offset + 1024 * 1024, typecode, count]
+
+
+def _grow_heap(header):
+    offset, typecode, count = header["sections"]["heap"]
+    header["sections"]["heap"] = [offset, typecode, count + 1024 * 1024]
+
+
+def _drop_level(header):
+    header["levels"].pop()
+
+
+def _drop_title(header):
+    del header["title"]
+
+
+def _bad_typecode(header):
+    offset, _, count = header["sections"]["heap"]
+    header["sections"]["heap"] = [offset, "?", count]
+
+
+def _drop_extra_info_section(header):
+    level, no = next(
+        (level, no)
+        for level, level_header in enumerate(header["levels"])
+        for no, _ in enumerate(level_header["extra_infos"])
+    )
+    del header["sections"]["{}.extra.{}.values".format(level, no)]
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        _drop_heap,
+        _move_heap,
+        _grow_heap,
+        _drop_level,
+        _drop_title,
+        _bad_typecode,
+        _drop_extra_info_section,
+    ],
+)
+def test_columnar_shared_memory_malformed(sheet_cancer, corrupt):
+    data = bytearray(columnar.build_columnar(sheet_cancer))
+    _, _, header_length, header_offset = columnar._PREFIX.unpack_from(data)
+    header = json.loads(bytes(data[header_offset : header_offset + header_length]))
+    corrupt(header)
+    # compact such that the data fits into the segment of the valid sheet
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data[header_offset:] = header_bytes
+    columnar._PREFIX.pack_into(
+        data,
+        0,
+        columnar.COLUMNAR_MAGIC,
+        columnar.COLUMNAR_FORMAT_VERSION,
+        len(header_bytes),
+        header_offset,
+    )
+    with pytest.raises(columnar.ColumnarSheetException):
+        columnar.ColumnarSheet(bytes(data))
+    with columnar.SharedColumnarSheet(sheet_cancer) as shared:
+        shared.shared_memory.buf[: len(data)] = data
+        with pytest.raises(columnar.ColumnarSheetException):
+            columnar.ColumnarSheet.attach(shared.name)
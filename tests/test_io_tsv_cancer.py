@@ -570,3 +570,8 @@ def test_read_tumor_json_header(tsv_sheet_cancer_header):
 def test_read_tumor_json_no_header(tsv_sheet_cancer_no_header):
     sheet_struc = io_tsv.read_cancer_tsv_json_data(tsv_sheet_cancer_no_header)
     assert EXPECTED_CANCER_SHEET_JSON_NO_HEADER == json.dumps(sheet_struc, indent="    ")
+
+
+def test_read_cancer_json_header_processes(tsv_sheet_cancer_header):
+    sheet_struc = io_tsv.CancerTSVReader(tsv_sheet_cancer_header).read_json_data(processes=3)
+    assert EXPECTED_CANCER_SHEET_JSON_HEADER == json.dumps(sheet_struc, indent="    ")
@@ -356,3 +356,23 @@ def test_read_tumor_json_header(tsv_sheet_generic_header):
 def test_read_tumor_json_no_header(tsv_sheet_generic_no_header):
     sheet_struc = io_tsv.read_generic_tsv_json_data(tsv_sheet_generic_no_header)
     assert EXPECTED_GENERIC_SHEET_JSON_NO_HEADER == json.dumps(sheet_struc, indent="    ")
+
+
+def test_read_generic_json_extra_info_defs_cached(
+    tsv_sheet_generic_header, tsv_sheet_generic_no_header
+):
+    io_tsv.clear_extra_info_defs_cache()
+    first = io_tsv.read_generic_tsv_json_data(tsv_sheet_generic_header)
+    first["extraInfoDefs"]["ngsLibrary"].clear()  # must not leak into cache
+    second = io_tsv.read_generic_tsv_json_data(tsv_sheet_generic_no_header)
+    assert EXPECTED_GENERIC_SHEET_JSON_NO_HEADER == json.dumps(second, indent="    ")
+
+
+def test_read_generic_json_extra_info_defs_uncached(tsv_sheet_generic_header):
+    class UncachedGenericTSVReader(io_tsv.GenericTSVReader):
+        cache_extra_info_defs = False
+
+    io_tsv.clear_extra_info_defs_cache()
+    sheet_struc = UncachedGenericTSVReader(tsv_sheet_generic_header).read_json_data()
+    assert EXPECTED_GENERIC_SHEET_JSON_HEADER == json.dumps(sheet_struc, indent="    ")
+    assert not io_tsv.base._EXTRA_INFO_DEFS_CACHE
@@ -274,3 +274,16 @@ def test_read_generic_sheet_custom_fields_json_no_header(tsv_sheet_generic_no_he
         "ngsLibraryConcentration, testSampleConcentration, uberonCellSource"
     )
     assert expected == str(e_info.value)
+
+
+def test_read_generic_custom_fields_convert_tsv_line_override(tsv_sheet_generic_header):
+    class Reader(io_tsv.GenericTSVReader):
+        @classmethod
+        def convert_tsv_line(cls, mapping, tsv_header):
+            mapping = super().convert_tsv_line(mapping, tsv_header)
+            mapping["testSampleConcentration"] *= 1000
+            return mapping
+
+    sheet_struc = Reader(tsv_sheet_generic_header).read_json_data()
+    test_sample = sheet_struc["bioEntities"]["E001"]["bioSamples"]["BS1"]["testSamples"]["TS1"]
+    assert test_sample["extraInfo"]["testSampleConcentration"] == 30.0
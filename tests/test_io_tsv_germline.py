@@ -9,6 +9,14 @@ import textwrap
 import pytest
 
 from biomedsheets import io_tsv
+from biomedsheets.io import (
+    ExtraInfoBuilder,
+    LazyBioEntities,
+    SheetBuilder,
+    compile_extra_info_defs,
+    load_snapshot,
+    save_snapshot,
+)
 
 __author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
 
@@ -953,3 +961,114 @@ def test_read_tumor_json_no_header(tsv_sheet_germline_no_header):
 def test_read_tumor_json_platform_name(tsv_sheet_germline_platform_name):
     sheet_struc = io_tsv.read_germline_tsv_json_data(tsv_sheet_germline_platform_name)
     assert EXPECTED_GERMLINE_SHEET_JSON_PLATFORM_NAME == json.dumps(sheet_struc, indent="    ")
+
+
+def test_read_germline_json_header_streaming(tsv_sheet_germline_header):
+    sheet_struc = io_tsv.GermlineTSVReader(tsv_sheet_germline_header).read_json_data(streaming=True)
+    assert EXPECTED_GERMLINE_SHEET_JSON_HEADER == json.dumps(sheet_struc, indent="    ")
+
+
+def test_read_germline_json_no_header_streaming(tsv_sheet_germline_no_header):
+    sheet_struc = io_tsv.GermlineTSVReader(tsv_sheet_germline_no_header).read_json_data(
+        streaming=True
+    )
+    assert EXPECTED_GERMLINE_SHEET_JSON_NO_HEADER == json.dumps(sheet_struc, indent="    ")
+
+
+def test_stream_germline_json_non_contiguous():
+    f = io.StringIO(
+        textwrap.dedent(
+            """
+    patientName\tfatherName\tmotherName\tsex\tisAffected\tlibraryType\tfolderName\thpoTerms
+    12_345\t12_346\t12_347\tM\tY\tWGS\t12_345\t.
+    12_346\t.\t.\tM\tN\tWGS\t12_346\t.
+    12_345\t12_346\t12_347\tM\tY\tWES\t12_345\t.
+    """.lstrip()
+        )
+    )
+    json_data, bio_entities = io_tsv.GermlineTSVReader(f).stream_json_data()
+    assert list(json_data["bioEntities"]) == []
+    name, bio_entity = next(bio_entities)
+    assert name == "12_345"
+    assert bio_entity["pk"] == 1
+    with pytest.raises(io_tsv.TSVSheetException):
+        list(bio_entities)
+
+
+def test_read_germline_json_invalid_sex():
+    f = io.StringIO(
+        textwrap.dedent(
+            """
+    patientName\tfatherName\tmotherName\tsex\tisAffected\tlibraryType\tfolderName\thpoTerms
+    12_345\t.\t.\tM\tY\tWGS\t12_345\t.
+    12_346\t.\t.\tX\tN\tWGS\t12_346\t.
+    """.lstrip()
+        )
+    )
+    with pytest.raises(io_tsv.GermlineTSVSheetException) as exc_info:
+        io_tsv.read_germline_tsv_json_data(f)
+    assert 'Invalid "sex" value X in line 3' in str(exc_info.value)
+
+
+def test_read_germline_json_header_processes(tsv_sheet_germline_header):
+    sheet_struc = io_tsv.GermlineTSVReader(tsv_sheet_germline_header).read_json_data(processes=2)
+    assert EXPECTED_GERMLINE_SHEET_JSON_HEADER == json.dumps(sheet_struc, indent="    ")
+
+
+def test_read_germline_sheet_lazy(tsv_sheet_germline_header):
+    json_data = io_tsv.read_germline_tsv_json_data(tsv_sheet_germline_header)
+    eager = SheetBuilder(json_data).run()
+    lazy = SheetBuilder(json_data).run(lazy=True)
+    assert isinstance(lazy.bio_entities, LazyBioEntities)
+    assert list(lazy.bio_entities) == list(eager.bio_entities)
+    assert lazy.bio_entities.built_count == 0
+    ngs_library = lazy.crawl("12_348-N1-DNA1-WGS1")
+    assert lazy.bio_entities.built_count == 1
+    assert ngs_library.name == eager.crawl("12_348-N1-DNA1-WGS1").name
+    assert ngs_library.test_sample.bio_sample.bio_entity is lazy.bio_entities["12_348"]
+    assert [e.name for e in lazy.bio_entities.values()] == [
+        e.name for e in eager.bio_entities.values()
+    ]
+    del lazy.bio_entities["12_345"]
+    assert len(lazy.bio_entities) == 3
+
+
+def test_compile_extra_info_defs(tsv_sheet_germline_header):
+    json_data = io_tsv.read_germline_tsv_json_data(tsv_sheet_germline_header)
+    converters = compile_extra_info_defs(json_data["extraInfoDefs"])
+    assert converters["bioEntity"]["hpoTerms"](("HP:1", "HP:2")) == ["HP:1", "HP:2"]
+    assert converters["bioEntity"]["ncbiTaxon"] is str
+    for key, value in json_data["extraInfoDefs"]["testSample"].items():
+        assert converters["testSample"][key] == ExtraInfoBuilder.compile(value)
+    with pytest.raises(KeyError):
+        converters["testSample"]["unknown"]
+    # Unused definitions are not compiled
+    json_data["extraInfoDefs"]["bioEntity"]["unused"] = {"type": "date"}
+    json_data["extraInfoDefs"]["bioEntity"]["unresolved"] = {"$ref": "unresolved.json"}
+    sheet = SheetBuilder(json_data).run()
+    assert sheet.bio_entities["12_345"].extra_infos["hpoTerms"] == ["HP:0009946", "HP:0009899"]
+
+
+def test_sheet_snapshot(tsv_sheet_germline_header, tmp_path):
+    source_path = tmp_path / "sheet.tsv"
+    source_path.write_text(tsv_sheet_germline_header.read())
+    with open(source_path, "rt") as inputf:
+        sheet = io_tsv.read_germline_tsv_sheet(inputf)
+    snapshot_path = str(tmp_path / "sheet.snapshot")
+    assert load_snapshot(snapshot_path) is None
+    save_snapshot(sheet, snapshot_path, source_path=str(source_path))
+    loaded = load_snapshot(snapshot_path, source_path=str(source_path))
+    assert loaded.json_data == sheet.json_data
+    assert loaded.name_generator.pattern == sheet.name_generator.pattern
+    ngs_library = loaded.crawl("12_345-N1-DNA1-WGS1")
+    assert ngs_library.name == sheet.crawl("12_345-N1-DNA1-WGS1").name
+    assert ngs_library.test_sample.bio_sample.bio_entity is loaded.bio_entities["12_345"]
+    # Lazily built sheets are written fully built
+    save_snapshot(SheetBuilder(sheet.json_data).run(lazy=True), snapshot_path)
+    assert list(load_snapshot(snapshot_path).bio_entities) == list(sheet.bio_entities)
+    # Stale snapshots are not loaded
+    save_snapshot(sheet, snapshot_path, source_path=str(source_path))
+    source_path.write_text(source_path.read_text() + "\n")
+    assert load_snapshot(snapshot_path, source_path=str(source_path)) is None
+    (tmp_path / "invalid.snapshot").write_bytes(b"invalid")
+    assert load_snapshot(str(tmp_path / "invalid.snapshot")) is None
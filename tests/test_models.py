@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Tests for the models module"""
+
+from collections import OrderedDict
+
+import pytest
+
+from biomedsheets import models
+from biomedsheets.naming import NAMING_ONLY_SECONDARY_ID, name_generator_for_scheme
+
+
+@pytest.fixture
+def bio_entity():
+    """Return BioEntity with one NGSLibrary"""
+    ngs_library = models.NGSLibrary(pk=4, disabled=False, secondary_id="WGS1")
+    test_sample = models.TestSample(
+        pk=3, disabled=False, secondary_id="DNA1", ngs_libraries={"WGS1": ngs_library}
+    )
+    bio_sample = models.BioSample(
+        pk=2,
+        disabled=False,
+        secondary_id="N1",
+        extra_infos={"isTumor": False},
+        test_samples={"DNA1": test_sample},
+    )
+    return models.BioEntity(
+        pk=1, disabled=False, secondary_id="P001", bio_samples={"N1": bio_sample}
+    )
+
+
+def test_slots(bio_entity):
+    ngs_library = bio_entity.crawl("N1-DNA1-WGS1")
+    for entry in (bio_entity, ngs_library.test_sample, ngs_library):
+        assert not hasattr(entry, "__dict__")
+    assert ngs_library.test_sample.bio_sample.bio_entity is bio_entity
+    assert bio_entity.sub_entries is bio_entity.bio_samples
+
+
+def test_lazy_extra_ids_and_infos(bio_entity):
+    bio_sample = bio_entity.bio_samples["N1"]
+    assert bio_sample.extra_infos == {"isTumor": False}
+    assert isinstance(bio_sample.extra_infos, OrderedDict)
+    assert bio_entity._extra_infos is None and bio_entity._extra_ids is None
+    assert bio_entity.extra_infos == {} and bio_entity.extra_ids == []
+    bio_entity.extra_infos["sex"] = "male"
+    bio_entity.extra_ids.append("X1")
+    assert bio_entity.extra_infos == {"sex": "male"}
+    assert bio_entity.extra_ids == ["X1"]
+    assert bio_sample.test_samples["DNA1"].extra_infos == {}
+
+
+def test_cached_names(bio_entity):
+    ngs_library = bio_entity.crawl("N1-DNA1-WGS1")
+    assert ngs_library.name == "P001-N1-DNA1-WGS1-000004"
+    assert ngs_library.name is ngs_library.name
+    bio_entity.secondary_id = "P002"
+    assert ngs_library.full_secondary_id == "P002-N1-DNA1-WGS1"
+    ngs_library.pk = 5
+    assert ngs_library.name == "P002-N1-DNA1-WGS1-000005"
+    ngs_library.name_generator = name_generator_for_scheme(NAMING_ONLY_SECONDARY_ID)
+    assert ngs_library.name == "P002-N1-DNA1-WGS1"
+    other = models.BioEntity(pk=6, disabled=False, secondary_id="P003")
+    ngs_library.test_sample.bio_sample.bio_entity = other
+    assert ngs_library.name == "P003-N1-DNA1-WGS1"
+    assert bio_entity.name == "P002-000001"
+
+
+def test_sheet_index(bio_entity):
+    sheet = models.Sheet("file://sheet.json", "Sheet", {}, bio_entities={"P001": bio_entity})
+    ngs_library = bio_entity.crawl("N1-DNA1-WGS1")
+    assert sheet.index.get_by_pk(4) is ngs_library
+    assert sheet.index.get_by_secondary_id("P001-N1-DNA1") is ngs_library.test_sample
+    assert sheet.index.get_by_name("P001-N1-DNA1-WGS1-000004") is ngs_library
+    assert sheet.index.get_by_name("P001-N1-DNA1-WGS1-000005") is None
+    assert sheet.index.get_by_name("invalid") is None
+    assert sheet.index._by_name is None  # misses do not build the mapping of all names
+    assert list(sheet.index.ngs_libraries.values()) == [ngs_library]
+    assert list(sheet.index.by_type[models.BioSample]) == ["P001-N1"]
+    other = models.BioEntity(pk=5, disabled=False, secondary_id="P002")
+    sheet.add_bio_entity(other)
+    assert sheet.index.get_by_name("P002-000005") is other
+    assert list(sheet.index.bio_entities) == ["P001", "P002"]
+    with pytest.raises(models.AmbiguousSecondaryIdException):
+        sheet.add_bio_entity(models.BioEntity(pk=6, disabled=False, secondary_id="P002"))
+    assert sheet.index.get_by_pk(6) is None
+
+
+def test_sheet_index_name_without_inverse(bio_entity):
+    sheet = models.Sheet(
+        "file://sheet.json",
+        "Sheet",
+        {},
+        bio_entities={"P001": bio_entity},
+        name_generator=lambda obj: obj.full_secondary_id,
+    )
+    ngs_library = bio_entity.crawl("N1-DNA1-WGS1")
+    assert sheet.index.get_by_name("P001-N1-DNA1-WGS1-000004") is ngs_library
+    assert sheet.index.get_by_name("invalid") is None
+    assert len(sheet.index._by_name) == 4
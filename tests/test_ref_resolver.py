@@ -1,10 +1,21 @@
 # -*- coding: utf-8 -*-
 """Tests for the reference resolving code."""
 
+from collections import OrderedDict
 import json
 import os
 
-from biomedsheets.ref_resolver import RefResolver
+import pytest
+import ruamel.yaml as ruamel_yaml
+
+from biomedsheets.ref_cache import RefDiskCache
+from biomedsheets.ref_resolver import (
+    JsonPointerException,
+    RefResolutionException,
+    RefResolver,
+    parse_json_pointer,
+    resolve_json_pointer,
+)
 
 
 def test_included():
@@ -28,3 +39,136 @@ def test_included():
         },
     }
     assert expected == result
+
+
+def test_parse_json_pointer():
+    assert parse_json_pointer("") == ()
+    assert parse_json_pointer("/") == ("",)
+    assert parse_json_pointer("/a~1b/m~0n/~01") == ("a/b", "m~n", "~1")
+    with pytest.raises(JsonPointerException):
+        parse_json_pointer("a/b")
+
+
+def test_resolve_json_pointer():
+    doc = {"foo": ["bar", "baz"], "a/b": 1, "m~n": {"": 2}}
+    assert resolve_json_pointer(doc, "") is doc
+    assert resolve_json_pointer(doc, "/foo/1") == "baz"
+    assert resolve_json_pointer(doc, "/a~1b") == 1
+    assert resolve_json_pointer(doc, "/m~0n/") == 2
+    for pointer in ("/missing", "/foo/2", "/foo/01", "/foo/-", "/a~1b/x"):
+        with pytest.raises(JsonPointerException):
+            resolve_json_pointer(doc, pointer)
+
+
+def test_resolve_fragment():
+    resolver = RefResolver()
+    obj = {
+        "sex": {"$ref": "resource://biomedsheets/data/std_fields.json#/extraInfoDefs/template/sex"}
+    }
+    result = resolver.resolve("file://unknown.json", obj)
+    assert result["sex"]["key"] == "sex"
+    obj = {"sex": {"$ref": "resource://biomedsheets/data/std_fields.json#/extraInfoDefs/missing"}}
+    with pytest.raises(RefResolutionException):
+        resolver.resolve("file://unknown.json", obj)
+
+
+def test_included_disk_cache(tmp_path):
+    path = os.path.join(os.path.abspath(os.path.dirname(__file__)), "data")
+    path_base = path + "/base.json"
+    with open(path_base, "rt") as file_json:
+        data_base = json.load(file_json)
+    cache_dir = str(tmp_path / "cache")
+    # First resolution fills the cache
+    resolver = RefResolver([path], cache_dir=cache_dir)
+    expected = resolver.resolve("file://" + path_base, data_base)
+    assert (resolver.disk_cache_hits, resolver.disk_cache_misses) == (0, 3)
+    # Second resolution with new resolver is served from the cache
+    resolver = RefResolver([path], cache_dir=cache_dir)
+    assert expected == resolver.resolve("file://" + path_base, data_base)
+    assert (resolver.disk_cache_hits, resolver.disk_cache_misses) == (3, 0)
+    # Documents are cached per ``dict_class``
+    resolver = RefResolver([path], dict_class=OrderedDict, cache_dir=cache_dir)
+    result = resolver.resolve("file://" + path_base, data_base)
+    assert (resolver.disk_cache_hits, resolver.disk_cache_misses) == (0, 3)
+    assert expected == result
+    assert type(expected["more"]) is dict and type(result["more"]) is OrderedDict
+
+
+def test_disk_cache_validator_and_eviction(tmp_path):
+    cache = RefDiskCache(str(tmp_path), max_size=1600)
+    cache.put("file:///a.json", (1, 2), {"key": "a"})
+    assert cache.get("file:///a.json", (1, 2)).value == {"key": "a"}
+    assert cache.get("file:///a.json", (1, 3)) is None
+    assert cache.get("file:///b.json") is None
+    cache.put("file:///b.json", (1, 2), {"key": "b" * 1500})
+    assert cache.get("file:///a.json") is None
+    assert cache.get("file:///b.json").value == {"key": "b" * 1500}
+
+
+def test_structural_sharing():
+    path = os.path.join(os.path.abspath(os.path.dirname(__file__)), "data")
+    path_base = path + "/base.json"
+    with open(path_base, "rt") as file_json:
+        data_base = json.load(file_json)
+    data_base["plain"] = {"list": [{"x": 1}], "y": "z"}
+    expected = RefResolver([path]).resolve("file://" + path_base, data_base)
+    result = RefResolver([path], structural_sharing=True).resolve("file://" + path_base, data_base)
+    assert expected == result
+    assert result["plain"] is data_base["plain"]
+    assert expected["plain"] is not data_base["plain"]
+    assert result["nested"] is not data_base["nested"]
+
+
+def test_load_json_and_yaml(tmp_path):
+    (tmp_path / "defs.yaml").write_text("defs:\n  a: 1\n  b: [x, y]\n")
+    (tmp_path / "defs.json").write_text('{"defs": {"c": true}}')
+    (tmp_path / "other.txt").write_text("defs:\n  d: null-ish\n")
+    resolver = RefResolver([str(tmp_path)], dict_class=OrderedDict)
+    obj = {
+        "yaml": {"$ref": "file://defs.yaml#/defs"},
+        "json": {"$ref": "file://defs.json#/defs"},
+        "fallback": {"$ref": "file://other.txt#/defs"},
+    }
+    result = resolver.resolve("file://unknown.json", obj)
+    assert result == {
+        "yaml": {"a": 1, "b": ["x", "y"]},
+        "json": {"c": True},
+        "fallback": {"d": "null-ish"},
+    }
+    assert type(resolver.cache["file://" + str(tmp_path / "defs.yaml")]["defs"]) is OrderedDict
+
+
+def test_load_yaml_1_2(tmp_path):
+    (tmp_path / "defs.yaml").write_text("defs:\n  flag: no\n  number: 010\n")
+    resolver = RefResolver([str(tmp_path)], dict_class=OrderedDict)
+    result = resolver.resolve("file://main.json", {"defs": {"$ref": "file://defs.yaml#/defs"}})
+    assert result == {"defs": {"flag": "no", "number": 10}}
+    assert result["defs"] == dict(
+        ruamel_yaml.YAML().load((tmp_path / "defs.yaml").read_text())["defs"]
+    )
+
+
+def test_prefetch(tmp_path, mocker):
+    for i in range(4):
+        ref = {"$ref": "file://doc{}.json#/value".format(i + 1)} if i < 3 else "leaf"
+        (tmp_path / "doc{}.json".format(i)).write_text(json.dumps({"value": {"x": ref}}))
+    obj = {"a": {"$ref": "file://doc0.json#/value"}, "b": {"$ref": "#/local"}, "local": {"y": 1}}
+    expected = RefResolver([str(tmp_path)], prefetch_workers=0).resolve("file://main.json", obj)
+    resolver = RefResolver([str(tmp_path)], prefetch_workers=4)
+    spy = mocker.spy(resolver, "_load_for_cache")
+    assert resolver.resolve("file://main.json", obj) == expected
+    assert spy.call_count == 4  # all loaded by prefetching, once each
+    assert expected["b"] == {"y": 1}
+    assert expected["a"]["x"]["x"]["x"]["x"] == "leaf"
+
+
+def test_prefetch_errors_are_raised_on_resolution(tmp_path):
+    (tmp_path / "doc.json").write_text("{}")
+    obj = {"a": {"$ref": "file://doc.json#/missing"}}
+    for workers in (0, 4):
+        with pytest.raises(RefResolutionException, match="Could not resolve reference URI"):
+            RefResolver([str(tmp_path)], prefetch_workers=workers).resolve("file://x.json", obj)
+    obj = {"a": {"$ref": "file://missing.json"}}
+    for workers in (0, 4):
+        with pytest.raises(RefResolutionException, match="Could not find local file"):
+            RefResolver([str(tmp_path)], prefetch_workers=workers).resolve("file://x.json", obj)
@@ -2,11 +2,13 @@
 """Tests for the shortcuts module with cancer sample sheet"""
 
 import collections
+import io as _io
 import os
+import textwrap
 
 import pytest
 
-from biomedsheets import io, ref_resolver, shortcuts
+from biomedsheets import io, io_tsv, ref_resolver, shortcuts
 
 __author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
 
@@ -114,3 +116,89 @@ def test_cancer_bio_sample(sheet_cancer):
     normal_sample = cancer_cases.donors[0].primary_pair.normal_sample
     assert normal_sample.name == "EX_001-N1-000002"
     assert not normal_sample.is_tumor
+
+
+@pytest.fixture
+def sheet_cancer_incomplete():
+    """Return ``Sheet`` with one donor lacking a normal and one lacking a tumor sample"""
+    f = _io.StringIO(
+        textwrap.dedent(
+            """
+    patientName\tsampleName\tisTumor\tlibraryType\tfolderName
+    P001\tN1\tN\tWES\tP001-N1
+    P001\tT1\tY\tmRNA_seq\tP001-T1-RNA
+    P001\tT1\tY\tWES\tP001-T1
+    P001\tT2\tY\tWES\tP001-T2
+    P002\tT1\tY\tWES\tP002-T1
+    P003\tN1\tN\tWES\tP003-N1
+    """.lstrip()
+        )
+    )
+    return io_tsv.read_cancer_tsv_sheet(f)
+
+
+def test_cancer_missing_samples(sheet_cancer_incomplete):
+    """Test for primary sample selection with missing normal and tumor samples"""
+    with pytest.raises(shortcuts.MissingDataEntity):
+        shortcuts.CancerCaseSheet(sheet_cancer_incomplete)
+    options = shortcuts.CancerCaseSheetOptions(allow_missing_normal=True, allow_missing_tumor=True)
+    with pytest.warns(shortcuts.MissingDataWarning) as record:
+        cancer_cases = shortcuts.CancerCaseSheet(sheet_cancer_incomplete, options)
+    assert [str(w.message).split(" for ")[0] for w in record] == [
+        "Could not find primary normal sample",
+        "Could not find a BioSample with isTumor = true",
+    ]
+    donor1, donor2, donor3 = cancer_cases.donors
+    assert [pair.tumor_sample.secondary_id for pair in donor1.all_pairs] == ["T1", "T2"]
+    assert donor1.primary_pair is donor1.all_pairs[0]
+    tumor_sample = donor1.primary_pair.tumor_sample
+    assert tumor_sample.dna_ngs_library.name == "P001-T1-DNA1-WES1-000009"
+    assert tumor_sample.rna_ngs_library.name == "P001-T1-RNA1-mRNA_seq1-000007"
+    assert donor1.all_pairs[1].tumor_sample.rna_test_sample is None
+    assert donor2.primary_pair is None and donor2.all_pairs == []
+    assert donor3.primary_pair is None and donor3.all_pairs == []
+    assert len(cancer_cases.all_sample_pairs) == 2
+
+
+def test_cancer_lookup(sheet_cancer_incomplete):
+    """Test for ``CancerCaseSheet.lookup()`` and the pair mappings"""
+    options = shortcuts.CancerCaseSheetOptions(allow_missing_normal=True, allow_missing_tumor=True)
+    with pytest.warns(shortcuts.MissingDataWarning):
+        cancer_cases = shortcuts.CancerCaseSheet(sheet_cancer_incomplete, options)
+    assert cancer_cases._index is None
+    donor1, donor2, _ = cancer_cases.donors
+    pair1, pair2 = donor1.all_pairs
+    # Donor
+    entry = cancer_cases.lookup(donor1.name)
+    assert str(entry).startswith("CancerIndexEntry(")
+    assert entry.donor is donor1 and entry.bio_sample is None
+    assert entry.pairs == [pair1, pair2] and entry.pair is pair1
+    # Tumor sample, its test samples and libraries
+    tumor_sample = pair1.tumor_sample
+    for name in (
+        tumor_sample.name,
+        tumor_sample.dna_test_sample.name,
+        tumor_sample.dna_ngs_library.name,
+        tumor_sample.rna_ngs_library.name,
+    ):
+        entry = cancer_cases.lookup(name)
+        assert entry.bio_sample is tumor_sample and entry.pairs == [pair1]
+    # Normal sample is part of both pairs
+    entry = cancer_cases.lookup(pair1.normal_sample.dna_ngs_library.name)
+    assert entry.bio_sample is pair1.normal_sample and entry.pairs == [pair1, pair2]
+    # Samples without pairs and unknown names
+    entry = cancer_cases.lookup(donor2.bio_samples["T1"].dna_ngs_library.name)
+    assert entry.donor is donor2 and entry.pairs == [] and entry.pair is None
+    assert cancer_cases.lookup("P004") is None
+    # Pair mappings
+    assert list(cancer_cases.all_sample_pairs_by_tumor_dna_ngs_library.values()) == [pair1, pair2]
+    assert list(cancer_cases.all_sample_pairs_by_tumor_dna_test_sample.values()) == [pair1, pair2]
+    assert cancer_cases.all_sample_pairs_by_tumor_rna_ngs_library == {
+        tumor_sample.rna_ngs_library.name: pair1
+    }
+    cancer_cases.all_sample_pairs_by_tumor_rna_ngs_library = {}
+    assert cancer_cases.all_sample_pairs_by_tumor_rna_ngs_library == {}
+    index = cancer_cases.index
+    assert cancer_cases.index is index
+    cancer_cases.reset_index()
+    assert cancer_cases.index is not index
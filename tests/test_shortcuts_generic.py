@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Tests for the generic shortcuts"""
+
+import io
+import textwrap
+
+import pytest
+
+from biomedsheets import io_tsv, shortcuts
+
+__author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
+
+
+@pytest.fixture
+def sheet_generic():
+    """Return ``Sheet`` instance for a generic example"""
+    f = io.StringIO(
+        textwrap.dedent(
+            """
+    [Metadata]
+    schema\tgeneric
+    schema_version\tv1
+    title\tExample generic study
+    description\tSimple example of a generic study sample sheet.
+
+    [Data]
+    bioEntity\tbioSample\ttestSample\tngsLibrary\textractionType\tlibraryType\tfolderName
+    E001\tBS1\tTS1\tLIB1\tRNA\ttotal_RNA_seq\tE001-BS1-TS1-LIB1
+    E001\tBS2\tTS1\tLIB1\tRNA\ttotal_RNA_seq\tE001-BS2-TS1-LIB1
+    E002\tBS1\tTS1\tLIB1\tRNA\ttotal_RNA_seq\tE002-BS1-TS1-LIB1
+    E002\tBS1\tTS1\tLIB2\tRNA\ttotal_RNA_seq\tE002-BS1-TS1-LIB2
+    """.lstrip()
+        )
+    )
+    return io_tsv.read_generic_tsv_sheet(f)
+
+
+def test_generic_sheet_lazy_wrappers(sheet_generic):
+    shortcut = shortcuts.GenericSampleSheet(sheet_generic)
+    assert isinstance(shortcut.bio_entities, shortcuts.LazyShortcutMapping)
+    assert list(shortcut.bio_entities) == ["E001", "E002"]
+    assert shortcut.bio_entities.built_count == 0
+    assert shortcut._all_ngs_libraries is None
+    donor = shortcut.bio_entities["E002"]
+    assert shortcut.bio_entities.built_count == 1
+    assert donor is shortcut.bio_entities["E002"]
+    assert donor.bio_entity is sheet_generic.bio_entities["E002"]
+    assert "E003" not in shortcut.bio_entities
+    with pytest.raises(KeyError):
+        shortcut.bio_entities["E003"]
+    ngs_library = donor.bio_samples["BS1"].test_samples["TS1"].ngs_libraries["LIB2"]
+    assert ngs_library.test_sample.bio_sample.bio_entity is donor
+    assert ngs_library.name == "E002-BS1-TS1-LIB2-000013"
+    assert [(key, value.name) for key, value in donor.bio_samples.items()] == [
+        ("BS1", donor.bio_samples["BS1"].name)
+    ]
+
+
+def test_generic_sheet_ngs_libraries(sheet_generic):
+    shortcut = shortcuts.GenericSampleSheet(sheet_generic)
+    assert [lib.name for lib in shortcut.all_ngs_libraries] == [
+        "E001-BS1-TS1-LIB1-000004",
+        "E001-BS2-TS1-LIB1-000007",
+        "E002-BS1-TS1-LIB1-000011",
+        "E002-BS1-TS1-LIB2-000013",
+    ]
+    assert [lib.name for lib in shortcut.primary_ngs_libraries] == [
+        "E001-BS1-TS1-LIB1-000004",
+        "E001-BS2-TS1-LIB1-000007",
+        "E002-BS1-TS1-LIB1-000011",
+    ]
+    assert (
+        shortcut.all_ngs_libraries[0]
+        is shortcut.bio_entities["E001"]
+        .bio_samples["BS1"]
+        .test_samples["TS1"]
+        .ngs_libraries["LIB1"]
+    )
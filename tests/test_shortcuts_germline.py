@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 """Tests for the shortcuts module with germline sample sheet"""
 
+import gzip
 import io
 import textwrap
 
 import pytest
 
 from biomedsheets import io_tsv, naming, shortcuts
-from biomedsheets.shortcuts.germline import InconsistentPedigreeException, UndefinedFieldException
+from biomedsheets.shortcuts.germline import (
+    InconsistentPedigreeException,
+    UndefinedFieldException,
+    write_pedigrees_to_ped,
+)
 
 __author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
 
@@ -478,6 +483,136 @@ def test_pedigree(sheet_germline):
     assert list(pedigree.secondary_id_to_donor) == ["index1", "father1", "mother1"]
 
 
+def test_pedigree_with_filtered_donors(sheet_germline):
+    """Tests for Pedigree.with_filtered_donors()"""
+    pedigree = sheet_germline.cohort.pedigrees[0]
+    index1, father1, mother1 = pedigree.donors
+    filtered = pedigree.with_filtered_donors(lambda d: d.secondary_id != "mother1")
+    assert [d.name for d in filtered.donors] == ["index1-000001", "father1-000005"]
+    assert filtered.index is index1
+    assert [d.name for d in filtered.founders] == ["father1-000005"]
+    new_index1, new_father1 = filtered.donors
+    assert new_index1 is not index1
+    assert new_index1.father is new_father1
+    assert new_index1.mother is None
+    assert new_index1.father_pk == "5"
+    assert new_index1.mother_pk is None
+    assert new_index1.dna_ngs_library is index1.dna_ngs_library
+    assert new_father1.extra_infos is father1.extra_infos
+    # The original donors are not modified
+    assert index1.mother is mother1
+    assert index1.mother_pk == "9"
+
+
+def _germline_sheet_summary(sheet):
+    """Return summary of the pedigrees and mappings of a ``GermlineCaseSheet``"""
+    cohort = sheet.cohort
+
+    def names(mapping):
+        return sorted((key, value.name) for key, value in mapping.items())
+
+    def pedigree_names(mapping):
+        return sorted((key, value.index.name) for key, value in mapping.items())
+
+    return {
+        "pedigrees": [
+            [
+                (d.name, d.father and d.father.name, d.mother and d.mother.name)
+                for d in pedigree.donors
+            ]
+            for pedigree in cohort.pedigrees
+        ],
+        "donors": [d.name for d in sheet.donors],
+        "indices": [d.name for d in cohort.indices],
+        "affecteds": [d.name for d in cohort.affecteds],
+        "cohort": [
+            sorted(getattr(cohort, attr))
+            for attr in ("name_to_pedigree", "pk_to_pedigree", "secondary_id_to_donor")
+        ],
+        "index_ngs_library_to_pedigree": pedigree_names(sheet.index_ngs_library_to_pedigree),
+        "donor_ngs_library_to_pedigree": pedigree_names(sheet.donor_ngs_library_to_pedigree),
+        "index_ngs_library_to_donor": names(sheet.index_ngs_library_to_donor),
+        "library_name_to_library": names(sheet.library_name_to_library),
+        "sheet": list(sheet.sheet.bio_entities),
+    }
+
+
+def test_germline_case_sheet_incremental(tsv_sheet_germline):
+    """Tests for adding, removing, and updating donors of a GermlineCaseSheet
+
+    The result must be the same as the one of a full rebuild.
+    """
+    full = io_tsv.read_germline_tsv_sheet(tsv_sheet_germline)
+    index1, father1, mother1 = list(full.bio_entities.values())[:3]
+    sheet = io_tsv.read_germline_tsv_sheet(io.StringIO(tsv_sheet_germline.getvalue()))
+    for bio_entity in (index1, father1, mother1):
+        sheet.remove_bio_entity(bio_entity.secondary_id)
+    case_sheet = shortcuts.GermlineCaseSheet(sheet)
+
+    def check():
+        expected = _germline_sheet_summary(shortcuts.GermlineCaseSheet(sheet))
+        assert _germline_sheet_summary(case_sheet) == expected
+
+    # The index cannot be added before its parents
+    with pytest.raises(KeyError):
+        case_sheet.add_donor(index1)
+    check()
+    father1_donor = case_sheet.add_donor(father1)
+    case_sheet.add_donor(mother1)
+    assert case_sheet.cohort.pedigree_count == 3
+    with pytest.raises(ValueError):
+        case_sheet.add_donor(father1)
+    check()
+    case_sheet.add_donor(index1)
+    assert case_sheet.cohort.pedigree_count == 2
+    assert [d.name for d in case_sheet.cohort.pedigrees[1].donors] == [
+        "father1-000005",
+        "mother1-000009",
+        "index1-000001",
+    ]
+    check()
+    # The father cannot be removed while the index is in the sheet
+    with pytest.raises(ValueError):
+        case_sheet.remove_donor(father1_donor)
+    case_sheet.remove_donor(case_sheet.cohort.secondary_id_to_donor["index1"])
+    assert case_sheet.cohort.pedigree_count == 3
+    assert sheet.index.get_by_secondary_id("index1") is None
+    check()
+    # Updating a donor keeps its position and rebuilds its pedigree
+    mother2 = case_sheet.cohort.secondary_id_to_donor["mother2"]
+    mother2.bio_entity.extra_infos["isAffected"] = "affected"
+    new_mother2 = case_sheet.update_donor(mother2.bio_entity)
+    assert case_sheet.donors[2] is new_mother2
+    assert case_sheet.cohort.indices[0].mother is new_mother2
+    assert case_sheet.cohort.affecteds[1] is new_mother2
+    check()
+
+
+def test_germline_case_sheet_incremental_join_by_field(tsv_sheet_germline_trio_plus):
+    """Tests for incremental updates of a GermlineCaseSheet with ``join_by_field``"""
+    sheet = io_tsv.read_germline_tsv_sheet(tsv_sheet_germline_trio_plus)
+    aunt1 = sheet.remove_bio_entity("aunt1")
+    case_sheet = shortcuts.GermlineCaseSheet(sheet, join_by_field="familyId")
+
+    def check():
+        expected = shortcuts.GermlineCaseSheet(sheet, join_by_field="familyId")
+        assert _germline_sheet_summary(case_sheet) == _germline_sheet_summary(expected)
+        assert case_sheet._join_value_to_pedigree == {
+            p.donors[0].extra_infos["familyId"]: p for p in case_sheet.cohort.pedigrees
+        }
+
+    case_sheet.add_donor(aunt1)
+    assert [len(p.donors) for p in case_sheet.cohort.pedigrees] == [4]
+    check()
+    aunt1.extra_infos["familyId"] = "family2"
+    case_sheet.update_donor(aunt1)
+    assert [len(p.donors) for p in case_sheet.cohort.pedigrees] == [3, 1]
+    check()
+    case_sheet.remove_donor(case_sheet.cohort.secondary_id_to_donor["aunt1"])
+    assert list(case_sheet._join_value_to_pedigree) == ["family1"]
+    check()
+
+
 def test_cohorts(sheet_germline):
     """Tests for Cohort object"""
     cohort = sheet_germline.cohort
@@ -521,6 +656,24 @@ def test_cohorts(sheet_germline):
     assert cohort.pedigree_count == 2
 
 
+def test_cohort_duplicates(sheet_germline):
+    """Tests for duplicate detection when building Cohort shortcuts"""
+    pedigree1, pedigree2 = sheet_germline.cohort.pedigrees
+    with pytest.raises(ValueError) as e:
+        shortcuts.Cohort([pedigree1, pedigree2, pedigree1])
+    expected = "Duplicate names when building cohort shortcuts: {}".format(
+        ["father1-000005", "index1-000001", "mother1-000009"]
+    )
+    assert str(e.value) == expected
+    cohort = shortcuts.Cohort([pedigree1])
+    with pytest.raises(ValueError):
+        cohort.add_pedigree(shortcuts.Pedigree(pedigree2.donors + pedigree1.donors[:1]))
+    assert list(cohort.name_to_donor) == [d.name for d in pedigree1.donors]
+    # Duplicates within one pedigree are not reported
+    cohort = shortcuts.Cohort([shortcuts.Pedigree(pedigree1.donors + pedigree1.donors[:1])])
+    assert list(cohort.name_to_donor) == [d.name for d in pedigree1.donors]
+
+
 def test_sheet_germline_inconsistent_pedigree(
     tsv_sheet_germline_inconsistent_pedigree,
     tsv_sheet_germline_trio_plus,
@@ -547,3 +700,26 @@ def test_sheet_germline_inconsistent_pedigree(
             sheet=io_tsv.read_germline_tsv_sheet(tsv_sheet_germline_inconsistent_pedigree),
             join_by_field="familyId",
         )
+
+
+def test_write_ped(sheet_germline_only_parent_samples, tmp_path):
+    """Tests for writing PED files"""
+    cohort = sheet_germline_only_parent_samples.cohort
+    expected = (
+        "FAM_father\tfather-N1-DNA1-WES1\t0\t0\t1\t1\n"
+        "FAM_father\tmother-N1-DNA1-WES1\t0\t0\t2\t1\n"
+        "FAM_father\tchild\tfather-N1-DNA1-WES1\tmother-N1-DNA1-WES1\t1\t2\n"
+    )
+    assert "".join(cohort.iter_ped_lines()) == expected
+    write_pedigrees_to_ped(cohort.pedigrees, str(tmp_path / "legacy.ped"))
+    assert (tmp_path / "legacy.ped").read_text() == expected
+    cohort.write_ped(str(tmp_path / "cohort.ped.gz"))
+    with gzip.open(str(tmp_path / "cohort.ped.gz"), "rt") as f:
+        assert f.read() == expected
+    paths = cohort.write_ped_files(str(tmp_path / "{family}.ped"), workers=2)
+    assert paths == [str(tmp_path / "FAM_father.ped")]
+    assert (tmp_path / "FAM_father.ped").read_text() == expected
+    # Changes of the donors are written without updating the shortcuts
+    cohort.pedigrees[0].donors[2].bio_entity.extra_infos["isAffected"] = "unaffected"
+    cohort.write_ped_files(str(tmp_path / "{family}.ped"))
+    assert (tmp_path / "FAM_father.ped").read_text().endswith("\t1\t1\n")
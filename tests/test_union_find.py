@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Tests for the union-find data structures"""
+
+from biomedsheets.union_find import ArrayUnionFind, InternedUnionFind, UnionFind
+
+__author__ = "Manuel Holtgrewe <manuel.holtgrewe@bihealth.de>"
+
+
+def test_array_union_find():
+    union_find = ArrayUnionFind(4)
+    assert len(union_find) == 4
+    assert union_find.add() == 4
+    assert [union_find.find(i) for i in range(5)] == [0, 1, 2, 3, 4]
+    root = union_find.union(0, 1)
+    assert union_find.find(0) == union_find.find(1) == root
+    union_find.union_many([(2, 3), (3, 4), (1, 1)])
+    assert len({union_find.find(i) for i in (2, 3, 4)}) == 1
+    assert union_find.find(0) != union_find.find(2)
+    union_find.union_many([(4, 0)])
+    assert len({union_find.find(i) for i in range(5)}) == 1
+    assert max(union_find.sizes) == 5
+
+
+def test_interned_union_find():
+    expected = UnionFind()
+    actual = InternedUnionFind(["a", "b"])
+    for union_find in (expected, actual):
+        union_find.union("a", "c", "d")
+        union_find["e"]
+    actual.union_many([("f", "b"), ("g", "f")])
+    expected.union("f", "b")
+    expected.union("g", "f")
+    assert list(actual) == ["a", "b", "c", "d", "e", "f", "g"]
+    assert len(actual) == 7
+
+    def partition(union_find):
+        result = {}
+        for key in sorted(union_find):
+            result.setdefault(union_find[key], []).append(key)
+        return sorted(result.values())
+
+    assert partition(actual) == partition(expected) == [["a", "c", "d"], ["b", "f", "g"], ["e"]]
+    assert actual["c"] in ("a", "c", "d")